@@ -1,19 +1,22 @@
 from __future__ import annotations
 
+import threading
+
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from schemas.state import CampaignState, Message, Step
 
 # if TYPE_CHECKING:
-from services.llm_node import llm_router
-from services.trend_tool import trend_analyzer
-from services.search_tool import search_engine
-from services.hashtag_gen import hashtag_generator
-from services.script_tool import script_generator
-from services.tts_tool import tts_generator
-
-from configs.llm_config import get_llm
+from services.llm_node import llm_router, route_steps
+from services.registry import get_tool_function
+from utils.metrics import timed_node
+
+from configs.logging_config import setup_logging
+import logging
 from dotenv import load_dotenv
 load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
 
 def format_campaign_output(state: CampaignState) -> str:
     lines = []
@@ -58,6 +61,10 @@ def format_campaign_output(state: CampaignState) -> str:
             lines.append(f"  - {idea}")
         lines.append("")
 
+    if state.audio_artifact_id:
+        lines.append(f"🔊 Voice-over: GET /agent/audio/{state.audio_artifact_id}")
+        lines.append("")
+
     if state.messages:
         lines.append("📨 Messages:")
         for msg in state.messages[-3:]:  # Show last few for brevity
@@ -67,63 +74,89 @@ def format_campaign_output(state: CampaignState) -> str:
     return "\n".join(lines)
 
 
-# Initialize LLM
-llm = get_llm()
+def new_campaign_state(prompt: str) -> CampaignState:
+    """Build the initial state for a campaign run from the user's prompt."""
+    return CampaignState(
+        campaign_theme="",
+        target_audience="",
+        duration_seconds=60,
+        tone="",
+        steps=[],
+        trends=[],
+        search_results=[],
+        hashtags=[],
+        script="",
+        production_ideas=[],
+        messages=[Message(role="user", content=prompt)],
+        current_step=""
+    )
+
 
 # Nodes
-def trend_analyzer_node(state: CampaignState) -> CampaignState:
-    result = trend_analyzer.invoke({"state": state})
+# Nodes call the tool functions (resolved through the lazy tool registry) directly on
+# the state the graph has already validated;
+# going through the @tool wrappers would serialize and re-validate the whole state
+# against their args_schema on every hop. The run config is passed on explicitly
+# because on Python 3.10 it does not reach coroutines through context variables,
+# and the script and speech generators need it for the stream writer.
+async def trend_analyzer_node(state: CampaignState, config: RunnableConfig) -> CampaignState:
+    result = await get_tool_function("trend_analyzer")(state)
     return {
         "trends": result["trends"],
         "messages": result["messages"],
-        "current_step": "trend_analyzer"
+        "steps": [Step(step="trend_analyzer", executed=True)]
     }
 
-def search_engine_node(state: CampaignState) -> CampaignState:
-    result = search_engine.invoke({"state": state})
+async def search_engine_node(state: CampaignState, config: RunnableConfig) -> CampaignState:
+    result = await get_tool_function("search_engine")(state)
     return {
         "search_results": result["search_results"],
         "messages": result["messages"],
-        "current_step": "search_engine"
+        "steps": [Step(step="search_engine", executed=True)]
     }
 
-def hashtag_generator_node(state: CampaignState) -> CampaignState:
-    result = hashtag_generator.invoke({"state": state})
+async def hashtag_generator_node(state: CampaignState, config: RunnableConfig) -> CampaignState:
+    result = await get_tool_function("hashtag_generator")(state)
     return {
         "hashtags": result["hashtags"],
         "messages": result["messages"],
-        "current_step": "hashtag_generator"
+        "steps": [Step(step="hashtag_generator", executed=True)]
     }
 
-def script_generator_node(state: CampaignState) -> CampaignState:
-    result = script_generator.invoke({"state": state})
+async def script_generator_node(state: CampaignState, config: RunnableConfig) -> CampaignState:
+    result = await get_tool_function("script_generator")(state, config)
     return {
         "script": result["script"],
         "production_ideas": result["production_ideas"],
         "messages": result["messages"],
-        "current_step": "script_generator"
+        "steps": [Step(step="script_generator", executed=True)]
     }
 
-def tts_generator_node(state: CampaignState) -> CampaignState:
-    result = tts_generator.invoke({"state": state})
+async def tts_generator_node(state: CampaignState, config: RunnableConfig) -> CampaignState:
+    result = await get_tool_function("tts_generator")(state, config)
     return {
+        "audio_artifact_id": result["audio_artifact_id"],
         "messages": result["messages"],
+        "steps": [Step(step="tts_generator", executed=True)]
     }
 
 # Build graph
-def build_graph():
+def build_graph(checkpointer=None):
+    """Compile the workflow; with a checkpointer, state is saved after every step per thread ID."""
     workflow = StateGraph(CampaignState)
-    workflow.add_node("llm_router", llm_router)
-    workflow.add_node("trend_analyzer", trend_analyzer_node)
-    workflow.add_node("search_engine", search_engine_node)
-    workflow.add_node("hashtag_generator", hashtag_generator_node)
-    workflow.add_node("script_generator", script_generator_node)
-    workflow.add_node("tts_generator", tts_generator_node)
-
-    # Edges
+    # Every node is timed (campaign_node_seconds and the per-run breakdown)
+    workflow.add_node("llm_router", timed_node("llm_router", llm_router))
+    workflow.add_node("trend_analyzer", timed_node("trend_analyzer", trend_analyzer_node))
+    workflow.add_node("search_engine", timed_node("search_engine", search_engine_node))
+    workflow.add_node("hashtag_generator", timed_node("hashtag_generator", hashtag_generator_node))
+    workflow.add_node("script_generator", timed_node("script_generator", script_generator_node))
+    workflow.add_node("tts_generator", timed_node("tts_generator", tts_generator_node))
+
+    # Edges: the router fans out to every step whose dependencies are done; tools
+    # dispatched together run in the same superstep and rejoin at the router
     workflow.add_conditional_edges(
         "llm_router",
-        lambda state: state.current_step,
+        route_steps,
         {
             "trend_analyzer": "trend_analyzer",
             "search_engine": "search_engine",
@@ -141,30 +174,44 @@ def build_graph():
     workflow.set_entry_point("llm_router")
 
     # Compile graph
-    graph = workflow.compile()
-
-    print(graph)
+    graph = workflow.compile(checkpointer=checkpointer)
+    logger.debug(f"Compiled workflow graph: {graph}")
     return graph
 
 
+# Compiled graphs are immutable and safe to share between concurrent invocations,
+# so each workflow variant is built once per process and reused.
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+_GRAPH_BUILDERS = {
+    "default": build_graph,
+}
+
+def get_graph(variant: str = "default"):
+    """Return the compiled graph for a workflow variant, compiling it on first use."""
+    graph = _graphs.get(variant)
+    if graph is None:
+        if variant not in _GRAPH_BUILDERS:
+            raise ValueError(f"Unknown workflow variant: {variant}")
+        with _graphs_lock:
+            graph = _graphs.get(variant)
+            if graph is None:
+                logger.info(f"Compiling '{variant}' workflow graph")
+                graph = _GRAPH_BUILDERS[variant]()
+                _graphs[variant] = graph
+    return graph
+
+def register_graph(variant: str, graph):
+    """Make an already compiled graph available through ``get_graph``.
 
-initial_state = CampaignState(
-    campaign_theme="",
-    target_audience="",
-    duration_seconds=60,
-    tone="",
-    steps=[],
-    trends=[],
-    search_results=[],
-    hashtags=[],
-    script="",
-    production_ideas=[],
-    messages=[Message(role="user", content="Provide a complete campaign for a new sustainable shoe brand focusing the millenials in a humorous tone.")],
-    current_step=""
-)
+    Used for variants whose resources only exist inside the running event loop,
+    such as the SQLite checkpointer connection opened in the app lifespan.
+    """
+    with _graphs_lock:
+        _graphs[variant] = graph
 
-graph = build_graph()
+def unregister_graph(variant: str):
+    with _graphs_lock:
+        _graphs.pop(variant, None)
 
-result = graph.invoke(initial_state)
-final_state = CampaignState(**result)
-print(format_campaign_output(final_state))
\ No newline at end of file
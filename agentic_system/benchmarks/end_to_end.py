@@ -0,0 +1,292 @@
+"""Offline end-to-end benchmark: campaigns against fake providers at varying concurrency.
+
+Every provider is replaced by the in-process fakes in ``benchmarks.fake_providers``,
+so no API keys or network access are needed. Each scenario runs ``--requests``
+campaigns per concurrency level through one or both drivers:
+
+- ``graph``: ``build_graph().ainvoke`` directly
+- ``api``: ``POST /agent/query`` on the FastAPI app (checkpointed graph, app lifespan)
+
+Scenarios:
+
+- ``research``: trend analysis and web search only
+- ``full``: research, hashtags and script
+- ``full_tts``: the full campaign plus the voice-over
+
+Every request uses a new campaign theme, so the response, trend and search caches
+and the voice-over store never serve a repeat. The providers' rate limiters are
+lifted unless ``--rate-limits`` is given, so the numbers reflect the workflow
+rather than the configured quotas. For each run the report gives throughput,
+p50/p95/p99 latency and peak RSS (sampled while the run is in progress). It is
+written as JSON so results from two commits can be compared with ``--compare``.
+Provider failures are mostly absorbed by the tools' fallbacks (except script and
+speech failures on ``/agent/query``, which fail the run so it can be resumed), so
+each result also counts the simulated provider calls and errors behind it.
+
+The tokenizer that packs search evidence may try to download its encoding once;
+without network access it falls back to estimated token counts.
+
+Run from the ``agentic_system`` directory:
+
+    python -m benchmarks.end_to_end --concurrency 1 8 32 --requests 32 --output results.json
+    python -m benchmarks.end_to_end --latency openai=400,0.5,0.02 --compare results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.fake_providers import PROVIDERS, install, parse_profile
+
+SCENARIOS = {
+    "research": "Research current trends and web coverage for {theme}",
+    "full": "Provide a complete campaign with hashtags and a script for {theme}",
+    "full_tts": "Provide a complete campaign with hashtags, a script and a voice-over audio for {theme}",
+}
+DRIVERS = ("graph", "api")
+PRODUCTS = ("eco sneakers", "cold brew", "budget headphones", "vintage denim", "plant-based snacks", "smart water bottles")
+
+# Report fields compared by --compare; for throughput higher is better
+COMPARED = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mib")
+
+
+def _configure_environment(args, workdir: str):
+    """Settings read when the app modules are imported or first used; must run before importing them."""
+    for key in ("OPENAI_API_KEY", "GEMINI_API_KEY", "TAVILY_API_KEY", "NEW_SERPAPI_KEY"):
+        os.environ.setdefault(key, "benchmark-dummy-key")
+    os.environ["ARTIFACT_DIR"] = os.path.join(workdir, "artifacts")
+    os.environ["CHECKPOINT_PATH"] = os.path.join(workdir, "checkpoints.db")
+    for variable in ("SERPAPI_CACHE_PATH", "TAVILY_CACHE_PATH"):
+        os.environ.pop(variable, None)
+    if not args.rate_limits:
+        for provider in ("SERPAPI", "TAVILY"):
+            os.environ[f"{provider}_RATE_LIMIT"] = "1000000"
+            os.environ[f"{provider}_RATE_BURST"] = "1000000"
+    # Installing a root handler first keeps setup_logging from turning on INFO logs
+    logging.basicConfig(level=logging.WARNING)
+
+
+def _rss_mib() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # No procfs (e.g. macOS): the process-wide peak, in bytes on macOS and KiB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+async def _sample_rss(peak: List[float], interval: float = 0.02):
+    while True:
+        peak[0] = max(peak[0], _rss_mib())
+        await asyncio.sleep(interval)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+class _Prompts:
+    """Unique campaign themes across the whole run, so no cache ever sees a repeat."""
+
+    def __init__(self):
+        self.count = 0
+
+    def next(self, scenario: str) -> str:
+        self.count += 1
+        theme = f"{PRODUCTS[self.count % len(PRODUCTS)]} {self.count}"
+        return SCENARIOS[scenario].format(theme=theme)
+
+
+def _graph_driver():
+    from agent import build_graph, new_campaign_state
+
+    graph = build_graph()
+
+    async def run(prompt: str) -> Optional[str]:
+        await graph.ainvoke(new_campaign_state(prompt))
+        return None
+
+    return run
+
+
+def _api_driver(client):
+    async def run(prompt: str) -> Optional[str]:
+        response = await client.post("/agent/query", json={"prompt": prompt})
+        body = response.json()
+        if response.status_code != 200 or "error" in body:
+            return body.get("error", f"HTTP {response.status_code}")
+        return None
+
+    return run
+
+
+async def _measure(run, prompts: _Prompts, scenario: str, concurrency: int, requests: int) -> dict:
+    pending = asyncio.Queue()
+    for _ in range(requests):
+        pending.put_nowait(prompts.next(scenario))
+    latencies, errors = [], []
+
+    async def worker():
+        while not pending.empty():
+            prompt = pending.get_nowait()
+            started = time.perf_counter()
+            try:
+                error = await run(prompt)
+            except Exception as e:
+                error = str(e)
+            latencies.append(time.perf_counter() - started)
+            if error:
+                errors.append(error)
+
+    peak = [_rss_mib()]
+    sampler = asyncio.create_task(_sample_rss(peak))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    peak[0] = max(peak[0], _rss_mib())
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 3),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 1),
+        "p50_ms": round(_percentile(latencies_ms, 50), 1),
+        "p95_ms": round(_percentile(latencies_ms, 95), 1),
+        "p99_ms": round(_percentile(latencies_ms, 99), 1),
+        "max_ms": round(latencies_ms[-1], 1),
+        "peak_rss_mib": round(peak[0], 1),
+        "sample_errors": sorted(set(errors))[:3],
+    }
+
+
+def _counters(behaviours) -> Dict[str, tuple]:
+    return {provider: (behaviour.calls, behaviour.errors) for provider, behaviour in behaviours.items()}
+
+
+async def _run_driver(name: str, run, args, prompts: _Prompts, behaviours) -> List[dict]:
+    results = []
+    for scenario in args.scenarios:
+        # One untimed campaign first, so lazy imports and first-use setup are not measured
+        await run(prompts.next(scenario))
+        for concurrency in args.concurrency:
+            before = _counters(behaviours)
+            result = {"driver": name, **await _measure(run, prompts, scenario, concurrency, args.requests)}
+            after = _counters(behaviours)
+            # Tools fall back on provider failures, so a campaign can succeed despite injected errors
+            result["provider_calls"] = {provider: after[provider][0] - before[provider][0] for provider in after}
+            result["provider_errors"] = {provider: after[provider][1] - before[provider][1] for provider in after}
+            print(
+                f"{name:>5} {scenario:>8} c={concurrency:<3} {result['throughput_rps']:8.2f} req/s  "
+                f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                f"rss {result['peak_rss_mib']:7.1f} MiB  errors {result['errors']}",
+                file=sys.stderr,
+            )
+            results.append(result)
+    return results
+
+
+async def _run(args, behaviours) -> List[dict]:
+    prompts = _Prompts()
+    results = []
+    if "graph" in args.drivers:
+        results += await _run_driver("graph", _graph_driver(), args, prompts, behaviours)
+    if "api" in args.drivers:
+        import httpx
+        from main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+                results += await _run_driver("api", _api_driver(client), args, prompts, behaviours)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: List[dict], baseline_path: str):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    previous = {(r["driver"], r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\nChange against {baseline_path} (commit {baseline['meta'].get('git_commit')}):", file=sys.stderr)
+    for result in results:
+        before = previous.get((result["driver"], result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        changes = "  ".join(
+            f"{field} {(result[field] - before[field]) / before[field] * 100:+.1f}%" if before[field] else f"{field} n/a"
+            for field in COMPARED
+        )
+        print(f"{result['driver']:>5} {result['scenario']:>8} c={result['concurrency']:<3} {changes}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", nargs="+", choices=DRIVERS, default=list(DRIVERS))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Campaigns in flight")
+    parser.add_argument("--requests", type=int, default=32, help="Timed campaigns per scenario and concurrency level")
+    parser.add_argument(
+        "--latency", action="append", default=[], metavar="PROVIDER=MEDIAN_MS[,SIGMA[,ERROR_RATE]]",
+        help=f"Override a provider's latency and error distribution; providers: {', '.join(PROVIDERS)}"
+    )
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Multiplier for every simulated latency")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the configured provider rate limits")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Print the change against an earlier JSON report")
+    args = parser.parse_args()
+
+    profiles = dict(parse_profile(spec) for spec in args.latency)
+    with tempfile.TemporaryDirectory(prefix="campaign-benchmark-") as workdir:
+        _configure_environment(args, workdir)
+        behaviours = install(profiles, time_scale=args.time_scale, seed=args.seed)
+        results = asyncio.run(_run(args, behaviours))
+
+    report = {
+        "meta": {
+            "git_commit": _git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time_scale": args.time_scale,
+            "rate_limits": args.rate_limits,
+            "seed": args.seed,
+            "profiles": {provider: behaviour.profile._asdict() for provider, behaviour in behaviours.items()},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""In-process stand-ins for OpenAI, SerpAPI, Tavily and Gemini with configurable latency and errors.
+
+``install`` swaps each fake in at the seam the workflow already uses to reach the
+provider (the ``ChatOpenAI`` class ``get_llm`` instantiates, ``GoogleSearch`` in
+the trend tool, ``TavilySearchResults`` in the search tool and the Gemini client
+of the TTS tool), so the response cache, rate limiters, shared lookups and
+instrumentation all stay on the measured path. Responses are shaped like the
+real ones and sized like typical production payloads; latencies are drawn from
+a log-normal distribution per provider and calls fail at a configurable rate.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+PROVIDERS = ("openai", "serpapi", "tavily", "gemini")
+
+
+class LatencyProfile(NamedTuple):
+    # Median latency of one call; for streamed completions, the time until the last chunk
+    median_ms: float
+    # Log-normal shape; 0 makes every call take exactly the median
+    sigma: float = 0.3
+    # Share of calls that raise FakeProviderError
+    error_rate: float = 0.0
+
+
+# Roughly what the real providers take for this workload
+DEFAULT_PROFILES: Dict[str, LatencyProfile] = {
+    "openai": LatencyProfile(median_ms=1500, sigma=0.4),
+    "serpapi": LatencyProfile(median_ms=900, sigma=0.3),
+    "tavily": LatencyProfile(median_ms=1200, sigma=0.3),
+    "gemini": LatencyProfile(median_ms=2500, sigma=0.3),
+}
+
+
+def parse_profile(spec: str) -> tuple:
+    """Parse ``provider=median_ms[,sigma[,error_rate]]``, e.g. ``tavily=800,0.5,0.02``."""
+    provider, _, values = spec.partition("=")
+    if provider not in PROVIDERS or not values:
+        raise ValueError(f"Expected provider=median_ms[,sigma[,error_rate]] with a provider in {PROVIDERS}: {spec}")
+    return provider, LatencyProfile(*(float(value) for value in values.split(",")))
+
+
+class FakeProviderError(Exception):
+    """Raised by a fake provider to simulate a failed call."""
+
+
+class _Behaviour:
+    """Draws latencies and failures for one provider; thread safe, as SerpAPI calls run in threads."""
+
+    def __init__(self, provider: str, profile: LatencyProfile, time_scale: float, seed: int):
+        self.provider = provider
+        self.profile = profile
+        self.time_scale = time_scale
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(f"{seed}:{provider}")
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple:
+        """Return ``(seconds, fails)`` for the next call."""
+        with self._lock:
+            self.calls += 1
+            seconds = self.profile.median_ms / 1000 * math.exp(self._rng.gauss(0, self.profile.sigma))
+            fails = self._rng.random() < self.profile.error_rate
+            self.errors += fails
+        return seconds * self.time_scale, fails
+
+    def error(self) -> FakeProviderError:
+        return FakeProviderError(f"Simulated {self.provider} failure")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# OpenAI
+
+def _user_request(prompt: str) -> str:
+    match = re.search(r"Extract from '(.*)':\n", prompt, re.S)
+    return match.group(1) if match else prompt
+
+
+def _plan(prompt: str) -> dict:
+    """Router answer: the theme is whatever follows the last " for " of the request."""
+    request = _user_request(prompt)
+    theme = request.rsplit(" for ", 1)[-1].strip(" .") or "campaign"
+    lowered = request.lower()
+    steps = ["trend_analyzer", "search_engine"]
+    if "research" not in lowered:
+        steps += ["hashtag_generator", "script_generator"]
+        if "voice" in lowered or "audio" in lowered:
+            steps.append("tts_generator")
+    return {
+        "parameters": {"campaign_theme": theme, "target_audience": "Gen Z", "duration_seconds": 30, "tone": "humorous"},
+        "steps": [{"step": step} for step in steps],
+    }
+
+
+def _theme(prompt: str, pattern: str) -> str:
+    match = re.search(pattern, prompt)
+    return match.group(1) if match else "campaign"
+
+
+def _script(theme: str) -> dict:
+    return {
+        "script": (
+            f"[0:00–0:05] Close-up of a phone buzzing. Narrator: Still scrolling past {theme}? Not today. "
+            f"Everyone in the group chat already switched. "
+            f"[0:05–0:15] Quick cuts of friends trying {theme} in everyday places. Narrator: It fits your day, "
+            f"your budget and your feed. No filters needed. Real people, real reactions, zero regrets. "
+            f"[0:15–0:25] Split screen of before and after. Narrator: Same you, better {theme}. "
+            f"Your friends will ask where you got it, and you can finally tell them. "
+            f"[0:25–0:30] Logo on screen. Narrator: Try {theme} today. Tap the link and join the switch."
+        ),
+        "production_ideas": [
+            f"Shoot handheld vertical video of real customers using {theme} outdoors",
+            "Use fast jump cuts synced to a trending audio track with bold captions",
+        ],
+    }
+
+
+def _completion(prompt: str) -> dict:
+    """The JSON answer the real model is prompted for, recognised from the repo's prompt templates."""
+    if "Extract from '" in prompt:
+        return _plan(prompt)
+    if "generate 3-5 relevant keywords" in prompt:
+        theme = _theme(prompt, r"campaign theme '(.+?)'")
+        return {"keywords": [f"{theme} trends", f"{theme} reviews", f"best {theme}"]}
+    if "trending hashtags" in prompt:
+        words = re.sub(r"[^\w ]", "", _theme(prompt, r"Campaign Theme: (.+)")).split()
+        base = "".join(word.capitalize() for word in words) or "Campaign"
+        return {"hashtags": [f"#{base}", f"#{base}Life", f"#Try{base}", "#GenZFinds", "#TrendingNow"]}
+    return _script(_theme(prompt, r"Campaign Theme: (.+)"))
+
+
+class FakeChatModel:
+    """Answers the workflow's JSON-mode prompts like ChatOpenAI, including usage metadata."""
+
+    def __init__(self, behaviour: _Behaviour, stream_chunk_chars: int = 16):
+        self.behaviour = behaviour
+        self.stream_chunk_chars = stream_chunk_chars
+
+    @staticmethod
+    def _prompt(messages) -> str:
+        return "\n".join(m["content"] if isinstance(m, dict) else m.content for m in messages)
+
+    def _usage(self, prompt: str, content: str) -> dict:
+        input_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(content)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessage:
+        seconds, fails = self.behaviour.draw()
+        await asyncio.sleep(seconds)
+        if fails:
+            raise self.behaviour.error()
+        prompt = self._prompt(messages)
+        content = json.dumps(_completion(prompt))
+        return AIMessage(content=content, usage_metadata=self._usage(prompt, content))
+
+    async def astream(self, messages, **kwargs):
+        seconds, fails = self.behaviour.draw()
+        prompt = self._prompt(messages)
+        content = json.dumps(_completion(prompt))
+        pieces = [content[i:i + self.stream_chunk_chars] for i in range(0, len(content), self.stream_chunk_chars)]
+        # Time to first token is a fifth of the call; the rest is spread over the chunks
+        await asyncio.sleep(seconds / 5)
+        if fails:
+            raise self.behaviour.error()
+        for piece in pieces:
+            await asyncio.sleep(seconds * 4 / 5 / len(pieces))
+            yield AIMessageChunk(content=piece)
+        yield AIMessageChunk(content="", usage_metadata=self._usage(prompt, content))
+
+    def bind_tools(self, tools, **kwargs) -> "FakeChatModel":
+        return self
+
+
+# SerpAPI
+
+def make_google_search(behaviour: _Behaviour):
+    class FakeGoogleSearch:
+        """Blocking like serpapi.GoogleSearch; the trend tool runs it in a worker thread."""
+
+        def __init__(self, params: dict):
+            self.params = params
+
+        def get_dict(self) -> dict:
+            seconds, fails = behaviour.draw()
+            time.sleep(seconds)
+            if fails:
+                raise behaviour.error()
+            keyword = self.params["q"]
+            return {
+                "search_metadata": {"status": "Success"},
+                "organic_results": [
+                    {
+                        "position": i + 1,
+                        "title": f"{keyword}: what changed this season ({i + 1})",
+                        "link": f"https://example.com/{i}",
+                        "snippet": f"Why {keyword} keeps showing up in feeds, and what buyers say about {keyword} right now. " * 2,
+                        "sitelinks": {"inline": [{"title": f"{keyword} guide"}, {"title": f"{keyword} deals"}]} if i == 0 else {},
+                    }
+                    for i in range(8)
+                ],
+            }
+
+    return FakeGoogleSearch
+
+
+# Tavily
+
+def make_tavily(behaviour: _Behaviour, content_chars: int = 2000):
+    class FakeTavilySearchResults:
+        def __init__(self, **options):
+            self.options = options
+
+        async def ainvoke(self, query: str) -> list:
+            seconds, fails = behaviour.draw()
+            await asyncio.sleep(seconds)
+            if fails:
+                raise behaviour.error()
+            body = f"{query} is covered by reviewers, creators and retailers this week. "
+            return [
+                {
+                    "title": f"{query} ({i + 1})",
+                    "url": f"https://example.com/article/{i}",
+                    "content": (body * (content_chars // len(body) + 1))[:content_chars],
+                    "score": round(0.9 - i * 0.1, 2),
+                }
+                for i in range(self.options.get("max_results", 5))
+            ]
+
+    return FakeTavilySearchResults
+
+
+# Gemini
+
+class _Namespace:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeGeminiClient:
+    """Implements ``client.aio.models.generate_content`` for speech, returning silent 24 kHz 16-bit PCM."""
+
+    # About fifteen characters of narration per second of audio
+    CHARS_PER_SECOND = 15
+
+    def __init__(self, behaviour: _Behaviour):
+        self.behaviour = behaviour
+        self.aio = _Namespace(models=_Namespace(generate_content=self._generate_content))
+
+    async def _generate_content(self, model: str, contents: str, config=None):
+        seconds, fails = self.behaviour.draw()
+        await asyncio.sleep(seconds)
+        if fails:
+            raise self.behaviour.error()
+        pcm = bytes(int(len(contents) / self.CHARS_PER_SECOND * 24000) * 2)
+        part = _Namespace(inline_data=_Namespace(data=pcm))
+        return _Namespace(
+            candidates=[_Namespace(content=_Namespace(parts=[part]))],
+            usage_metadata=_Namespace(prompt_token_count=_estimate_tokens(contents), candidates_token_count=len(pcm) // 1000),
+        )
+
+
+def install(profiles: Optional[Dict[str, LatencyProfile]] = None, time_scale: float = 1.0, seed: int = 0) -> Dict[str, _Behaviour]:
+    """Route every provider call of this process to the fakes; returns per-provider call counters."""
+    profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+    behaviours = {provider: _Behaviour(provider, profiles[provider], time_scale, seed) for provider in PROVIDERS}
+
+    import langchain_openai
+    from configs import llm_config
+    from services import search_tool, trend_tool, tts_tool
+
+    # get_llm imports ChatOpenAI on first use, so the fake is picked up with the real parameters and cache
+    langchain_openai.ChatOpenAI = lambda **kwargs: FakeChatModel(behaviours["openai"])
+    llm_config._llms.clear()
+    trend_tool.GoogleSearch = make_google_search(behaviours["serpapi"])
+    search_tool.TavilySearchResults = make_tavily(behaviours["tavily"])
+    tts_tool._client = FakeGeminiClient(behaviours["gemini"])
+    return behaviours
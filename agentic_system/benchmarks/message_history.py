@@ -0,0 +1,146 @@
+"""Message history cost: append-only messages channel vs. returning the whole history from every node.
+
+Runs a checkpointed session, as resumable runs are, in which one node adds a
+message per step until the history holds ``N`` messages, with three shapes of
+the channel:
+
+- ``legacy_replace``: each node returns ``state.messages + [new]`` and the list is replaced
+- ``prefix_merge``: nodes return the full history and a reducer appends what follows
+  the shared prefix (needed once nodes ran in parallel), comparing every entry
+- ``append_only``: the ``CampaignState.messages`` channel; nodes return only new entries
+
+What the node's return value changes is what every step copies and writes: the
+entries the node hands back, and the bytes of that update the checkpointer
+serializes as the step's writes. Both are reported per step, with the time per
+step. The checkpoint itself still stores the whole channel after every step in
+all three shapes, so the time per step grows with the history either way; the
+writes only grow with it when nodes return the whole history.
+
+A campaign adds about ten messages, where the difference is small; it shows in
+long sessions and in resumed runs that replay their history.
+
+Run from the ``agentic_system`` directory:
+
+    python -m benchmarks.message_history --sizes 100 400 1600
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from typing_extensions import Annotated
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel
+
+from schemas.state import CampaignState, Message
+
+
+class LegacyHistory(BaseModel):
+    """The old shape of the channel: no reducer, every write replaces the list."""
+    messages: List[Message]
+    target: int
+
+
+def _merge_prefix(left: List[Message], right: List[Message]) -> List[Message]:
+    shared = 0
+    while shared < min(len(left), len(right)) and left[shared] == right[shared]:
+        shared += 1
+    return left + right[shared:]
+
+
+class PrefixMergeHistory(BaseModel):
+    messages: Annotated[List[Message], _merge_prefix]
+    target: int
+
+
+class AppendOnlyHistory(BaseModel):
+    messages: CampaignState.__annotations__["messages"]
+    target: int
+
+
+def _legacy_turn(state: LegacyHistory) -> dict:
+    return {"messages": state.messages + [Message(role="assistant", content=f"turn {len(state.messages)}")]}
+
+
+def _prefix_merge_turn(state: PrefixMergeHistory) -> dict:
+    return {"messages": state.messages + [Message(role="assistant", content=f"turn {len(state.messages)}")]}
+
+
+def _append_only_turn(state: AppendOnlyHistory) -> dict:
+    return {"messages": [Message(role="assistant", content=f"turn {len(state.messages)}")]}
+
+
+class _CountingSaver(InMemorySaver):
+    """In-memory checkpointer that counts what the nodes write."""
+
+    def __init__(self):
+        super().__init__()
+        self.entries = 0
+        self.write_bytes = 0
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        for channel, value in writes:
+            if channel == "messages":
+                self.entries += len(value)
+            self.write_bytes += len(self.serde.dumps_typed(value)[1])
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+def _build(schema, node, checkpointer):
+    workflow = StateGraph(schema)
+    workflow.add_node("turn", node)
+    workflow.set_entry_point("turn")
+    workflow.add_conditional_edges(
+        "turn",
+        lambda state: "END" if len(state.messages) >= state.target else "turn",
+        {"turn": "turn", "END": END},
+    )
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _measure(schema, node, size: int) -> dict:
+    checkpointer = _CountingSaver()
+    graph = _build(schema, node, checkpointer)
+    initial = {"messages": [Message(role="user", content="start")], "target": size}
+    config = {"recursion_limit": size + 10, "configurable": {"thread_id": "benchmark"}}
+    started = time.perf_counter()
+    result = graph.invoke(initial, config)
+    elapsed = time.perf_counter() - started
+    assert len(result["messages"]) == size
+    steps = size - 1
+    return {
+        "messages": size,
+        "seconds": round(elapsed, 4),
+        "us_per_step": round(elapsed / steps * 1e6, 1),
+        "entries_per_step": round(checkpointer.entries / steps, 1),
+        "write_bytes_per_step": round(checkpointer.write_bytes / steps),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 400, 1600])
+    args = parser.parse_args()
+
+    shapes = {
+        "legacy_replace": (LegacyHistory, _legacy_turn),
+        "prefix_merge": (PrefixMergeHistory, _prefix_merge_turn),
+        "append_only": (AppendOnlyHistory, _append_only_turn),
+    }
+    report = {name: [_measure(*shape, size) for size in args.sizes] for name, shape in shapes.items()}
+    print(json.dumps(report, indent=2))
+
+    # Per-step cost at the largest history, relative to the append-only channel
+    baseline = report["append_only"][-1]
+    for name, rows in report.items():
+        last = rows[-1]
+        print(
+            f"{name} at {last['messages']} messages: {last['us_per_step']} us "
+            f"(x{last['us_per_step'] / baseline['us_per_step']:.1f}) and "
+            f"{last['write_bytes_per_step']} bytes written per step"
+        )
+
+
+if __name__ == "__main__":
+    main()
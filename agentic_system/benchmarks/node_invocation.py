@@ -0,0 +1,100 @@
+"""Per-hop cost of invoking tool logic through its @tool wrapper vs. calling the function directly.
+
+Graph nodes used to call ``tool.ainvoke({"state": state})``; the tool then serializes
+and re-validates the whole CampaignState against its ``args_schema`` before running.
+This times that overhead on a realistically sized state (trends, search results with
+page content, message history) using a tool whose body does nothing, so only the
+invocation path is measured.
+
+Run from the ``agentic_system`` directory:
+
+    python -m benchmarks.node_invocation --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from langchain_core.tools import tool
+
+from agent import new_campaign_state
+from schemas.state import Message, RelatedContent, SearchItem, SearchResult, Step, TrendItem
+from services.hashtag_gen import HashtagGeneratorInput
+
+# Hops that ran through a tool wrapper in one full campaign
+TOOL_HOPS_PER_CAMPAIGN = 5
+
+
+async def _tool_body(state) -> dict:
+    return {}
+
+
+@tool(args_schema=HashtagGeneratorInput)
+async def _wrapped(state) -> dict:
+    """Does nothing; stands in for a workflow tool."""
+    return await _tool_body(state)
+
+
+def _sample_state(terms: int, items: int, content_chars: int, messages: int):
+    state = new_campaign_state("Provide a complete campaign for a new sustainable shoe brand")
+    keywords = [f"keyword {i}" for i in range(terms)]
+    return state.model_copy(update={
+        "campaign_theme": "sustainable shoes",
+        "target_audience": "millennials",
+        "tone": "humorous",
+        "trends": [
+            TrendItem(
+                keyword=keyword,
+                relevance=80,
+                related_content=[RelatedContent(title=f"{keyword} story {j}", snippet="x" * 200) for j in range(3)],
+                related_queries=[f"{keyword} query {j}" for j in range(5)],
+                trend_direction="rising",
+            )
+            for keyword in keywords
+        ],
+        "search_results": [
+            SearchResult(term=keyword, results=[
+                SearchItem(title=f"{keyword} result {j}", content="y" * content_chars, url=f"https://example.com/{j}", score=0.5)
+                for j in range(items)
+            ])
+            for keyword in keywords
+        ],
+        "messages": state.messages + [Message(role="assistant", content=f"message {i}") for i in range(messages)],
+        "steps": [Step(step=name, executed=True) for name in ("trend_analyzer", "search_engine")],
+    })
+
+
+async def _time(call, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    return (time.perf_counter() - started) / iterations
+
+
+async def _run(args):
+    state = _sample_state(args.terms, args.items, args.content_chars, args.messages)
+    via_tool = await _time(lambda: _wrapped.ainvoke({"state": state}), args.iterations)
+    direct = await _time(lambda: _tool_body(state), args.iterations)
+    saved = via_tool - direct
+    return {
+        "state_json_bytes": len(state.model_dump_json()),
+        "via_tool_us_per_hop": round(via_tool * 1e6, 1),
+        "direct_us_per_hop": round(direct * 1e6, 1),
+        "saved_us_per_hop": round(saved * 1e6, 1),
+        "saved_ms_per_campaign": round(saved * TOOL_HOPS_PER_CAMPAIGN * 1e3, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--terms", type=int, default=5, help="Trends and search terms in the state")
+    parser.add_argument("--items", type=int, default=5, help="Search items per term")
+    parser.add_argument("--content-chars", type=int, default=4000, help="Characters of page content per search item")
+    parser.add_argument("--messages", type=int, default=20, help="Messages in the history")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Startup benchmark: importing ``main:app`` must not touch the network and must stay within a time budget.
+
+The probe runs under ``-X importtime``; the modules with the largest cumulative
+import time are listed so a regression points at the import that caused it.
+
+Run from the ``agentic_system`` directory:
+
+    python -m benchmarks.startup --budget 5 --top 15
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import List
+
+# Executed in a fresh interpreter so module caches from this process don't skew the timing.
+_PROBE = r"""
+import json
+import socket
+import time
+
+attempts = []
+
+def _blocked(*args, **kwargs):
+    attempts.append(repr(args[:2]))
+    raise ConnectionRefusedError("outbound network access during import")
+
+socket.socket.connect = _blocked
+socket.socket.connect_ex = _blocked
+socket.create_connection = _blocked
+socket.getaddrinfo = _blocked
+
+start = time.perf_counter()
+from main import app
+elapsed = time.perf_counter() - start
+
+print(json.dumps({"import_seconds": elapsed, "outbound_attempts": attempts}))
+"""
+
+# "import time: <self us> | <cumulative us> | <indented module name>"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+# Client constructors refuse to start without keys; dummy values keep the probe offline-safe.
+_DUMMY_KEYS = ("OPENAI_API_KEY", "GEMINI_API_KEY", "TAVILY_API_KEY", "NEW_SERPAPI_KEY")
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Modules from ``-X importtime`` output, slowest cumulative import first."""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                # Nesting level in the import tree; 0 for modules imported by the probe itself
+                "depth": (len(indent) - 1) // 2,
+                "self_ms": round(int(self_us) / 1000, 1),
+                "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+            })
+    return sorted(modules, key=lambda module: module["cumulative_ms"], reverse=True)
+
+
+def run_probe() -> dict:
+    env = dict(os.environ)
+    for key in _DUMMY_KEYS:
+        env.setdefault(key, "benchmark-dummy-key")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing main:app failed:\n{completed.stderr}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["imports"] = parse_importtime(completed.stderr)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that importing main:app is side-effect free and fast.")
+    parser.add_argument("--budget", type=float, default=5.0, help="Maximum allowed import time in seconds")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    report = run_probe()
+    # One entry per top-level package (its slowest import), so a heavy dependency stands out
+    slowest, seen = [], set()
+    for module in report["imports"]:
+        package = module["module"].split(".")[0]
+        if package not in seen:
+            seen.add(package)
+            slowest.append(module)
+    report["imports"] = slowest[:args.top]
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if report["outbound_attempts"]:
+        failures.append(f"{len(report['outbound_attempts'])} outbound connection attempt(s) during import")
+    if report["import_seconds"] > args.budget:
+        failures.append(f"import took {report['import_seconds']:.2f}s, budget is {args.budget:.2f}s")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import argparse
+import asyncio
+
+from agent import format_campaign_output, get_graph, new_campaign_state
+from schemas.state import CampaignState
+
+DEFAULT_PROMPT = "Provide a complete campaign for a new sustainable shoe brand focusing the millenials in a humorous tone."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a single campaign through the content optimization agent.")
+    parser.add_argument("prompt", nargs="?", default=DEFAULT_PROMPT, help="Campaign request in natural language")
+    args = parser.parse_args()
+
+    graph = get_graph()
+    result = asyncio.run(graph.ainvoke(new_campaign_state(args.prompt)))
+    final_state = CampaignState(**result)
+    print(format_campaign_output(final_state))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,45 @@
-from langchain_openai import ChatOpenAI
+from utils.llm_cache import CachedChatModel, make_cached_model
+from utils.metrics import count_attempt
 
 
-_llm = None
+MODEL_PARAMS = {"model": "gpt-4o-mini", "temperature": 0.3}
 
-def get_llm() -> ChatOpenAI:
-    """Initialize and return the LLM with bound tools."""
-    global _llm #the llm instance is announced global, for use across the project and not having to insantiate a LLM instance everytime
+_llms = {}
 
-    if _llm is None:
-        from services.trend_tool import trend_analyzer
-        from services.search_tool import search_engine
-        from services.hashtag_gen import hashtag_generator
-        from services.script_tool import script_generator
-        from services.tts_tool import tts_generator
-        _llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
-        tools = [trend_analyzer, search_engine, hashtag_generator, script_generator, tts_generator]
-        _llm = _llm.bind_tools(tools, strict=True)
-    return _llm
\ No newline at end of file
+def get_llm(purpose: str = "json") -> CachedChatModel:
+    """Return the shared LLM client for a purpose, behind the response cache.
+
+    "json" is a plain client for the JSON-mode generation prompts; it sends no tool
+    schemas. "tools" has every workflow tool bound and is only for call sites that
+    actually let the model pick a tool; its responses are not cached.
+    """
+    #the llm instances are kept module-global, for use across the project and not having to insantiate a LLM instance everytime
+    if purpose not in _llms:
+        # Imported on first use; the OpenAI client stack is one of the slowest imports at startup
+        from langchain_openai import ChatOpenAI
+        from openai import DefaultAsyncHttpxClient
+        llm = ChatOpenAI(
+            **MODEL_PARAMS,
+            # Token usage is only reported at the end of a stream when asked for
+            stream_usage=True,
+            # The SDK retries failed requests itself; the hook counts every attempt
+            http_async_client=DefaultAsyncHttpxClient(event_hooks={"request": [count_attempt]}),
+        )
+        params = dict(MODEL_PARAMS)
+        if purpose == "tools":
+            from services.registry import get_tools
+            tools = get_tools()
+            llm = llm.bind_tools(tools, strict=True)
+            params["tools"] = [tool.name for tool in tools]
+        elif purpose != "json":
+            raise ValueError(f"Unknown LLM purpose: {purpose}")
+        # The cache keeps response content only, which would drop the tool calls
+        _llms[purpose] = make_cached_model(llm, model_params=params, cache_responses=purpose != "tools")
+    return _llms[purpose]
+
+def get_llm_stats() -> dict:
+    """Response cache statistics per call site, across every client created so far."""
+    stats = {}
+    for llm in _llms.values():
+        stats.update(llm.stats())
+    return stats
@@ -0,0 +1,190 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+# Job lifecycle: queued -> running -> succeeded | failed
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class Job(BaseModel):
+    job_id: str
+    prompt: str
+    status: str = QUEUED
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    formatted_output: Optional[str] = None
+    error: Optional[str] = None
+    # Per-run timing breakdown (see utils.metrics.RunMetrics)
+    timings: Optional[Dict[str, Any]] = None
+
+
+class JobStore(ABC):
+    """Where campaign jobs and their results live; implementations must be safe to share between workers."""
+
+    @abstractmethod
+    def create(self, job: Job):
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields):
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def claim(self, job_id: str) -> Optional[Job]:
+        """Atomically move a queued job to running and return it; None if it is not queued (any more)."""
+
+    @abstractmethod
+    def requeue_unfinished(self) -> List[Job]:
+        """Queue jobs left running by a stopped process again and return every queued job, oldest first."""
+
+
+class InMemoryJobStore(JobStore):
+    """Jobs of the current process only. Finished jobs are kept for ``retention_seconds``
+    and at most ``max_finished`` of them, evicting the oldest first."""
+
+    def __init__(self, retention_seconds: float = 3600, max_finished: int = 1000):
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        # Finished job IDs and when they finished, in the order they finished
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        expired = time.time() - self.retention_seconds
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at >= expired and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+    def create(self, job: Job):
+        with self._lock:
+            self._evict()
+            self._jobs[job.job_id] = job
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs[job_id] = self._jobs[job_id].model_copy(update=fields)
+            if job.status in FINISHED and job_id not in self._finished:
+                self._finished[job_id] = job.finished_at or time.time()
+                self._evict()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def claim(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return None
+            job = self._jobs[job_id] = job.model_copy(update={"status": RUNNING, "started_at": time.time()})
+            return job
+
+    def requeue_unfinished(self) -> List[Job]:
+        # Nothing outlives the process, so no job can be left running by another one
+        with self._lock:
+            return sorted((job for job in self._jobs.values() if job.status == QUEUED), key=lambda job: job.created_at)
+
+
+class SQLiteJobStore(JobStore):
+    """Keeps jobs across restarts so queued work can be picked up again.
+
+    Claiming a job is a single conditional UPDATE, so a queued job is run once even
+    if several workers see it. Restart recovery assumes one server process per
+    database file though: every job found running at startup is taken to belong
+    to a stopped process and is queued again, so a second live process sharing the
+    file would run its jobs twice.
+
+    Finished jobs are kept like in the in-memory store: for ``retention_seconds`` and
+    at most ``max_finished`` of them, deleting the oldest first whenever a job is
+    claimed or finishes.
+    """
+
+    def __init__(self, path: str, retention_seconds: float = 3600, max_finished: int = 1000):
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def _write(self, job: Job):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status, job.created_at, job.model_dump_json()),
+            )
+
+    def _evict(self):
+        finished_at = "json_extract(data, '$.finished_at')"
+        with self._conn:
+            self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN (?, ?) AND {finished_at} < ?",
+                (*FINISHED, time.time() - self.retention_seconds),
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE job_id IN ("
+                f"SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY {finished_at} DESC LIMIT -1 OFFSET ?)",
+                (*FINISHED, self.max_finished),
+            )
+
+    def _read(self, job_id: str) -> Optional[Job]:
+        row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    def create(self, job: Job):
+        with self._lock:
+            self._write(job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._read(job_id).model_copy(update=fields)
+            self._write(job)
+            if job.status in FINISHED:
+                self._evict()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._read(job_id)
+
+    def claim(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._evict()
+            with self._conn:
+                row = self._conn.execute(
+                    "UPDATE jobs SET status = ?, data = json_set(data, '$.status', ?, '$.started_at', ?) "
+                    "WHERE job_id = ? AND status = ? RETURNING data",
+                    (RUNNING, RUNNING, time.time(), job_id, QUEUED),
+                ).fetchone()
+            return Job(**json.loads(row[0])) if row else None
+
+    def requeue_unfinished(self) -> List[Job]:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, data = json_set(data, '$.status', ?, '$.started_at', NULL) WHERE status = ?",
+                (QUEUED, QUEUED, RUNNING),
+            )
+            rows = self._conn.execute("SELECT data FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)).fetchall()
+            return [Job(**json.loads(row[0])) for row in rows]
+
+
+def new_job(job_id: str, prompt: str) -> Job:
+    return Job(job_id=job_id, prompt=prompt, created_at=time.time())
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import List, Optional
+
+from agent import format_campaign_output, get_graph, new_campaign_state
+from jobs.store import FAILED, SUCCEEDED, InMemoryJobStore, Job, JobStore, SQLiteJobStore, new_job
+from schemas.state import CampaignState
+from utils.metrics import JOB_QUEUE_SECONDS, track_run
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity and cannot accept another campaign."""
+
+
+class CampaignJobQueue:
+    """Bounded queue of campaign jobs drained by a fixed pool of asyncio workers.
+
+    Submitting only records the job and enqueues its ID, so bursts are absorbed
+    by the queue while at most ``workers`` campaigns run the graph at once.
+    """
+
+    def __init__(self, store: JobStore, workers: int, max_queued: int):
+        self.store = store
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        # Pick up jobs a previous process accepted but did not finish
+        for job in self.store.requeue_unfinished():
+            try:
+                self._queue.put_nowait(job.job_id)
+            except asyncio.QueueFull:
+                self.store.update(job.job_id, status=FAILED, finished_at=time.time(), error="Job queue full on restart")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} campaign job workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, prompt: str) -> Job:
+        if self._queue.full():
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs waiting)")
+        job = new_job(uuid.uuid4().hex, prompt)
+        self.store.create(job)
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def _run(self, job_id: str):
+        job = self.store.claim(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} is no longer queued, skipping it")
+            return
+        JOB_QUEUE_SECONDS.observe(max(0.0, job.started_at - job.created_at))
+        try:
+            with track_run() as run:
+                result = await get_graph().ainvoke(new_campaign_state(job.prompt))
+            formatted_output = format_campaign_output(CampaignState(**result))
+            self.store.update(
+                job_id, status=SUCCEEDED, finished_at=time.time(), formatted_output=formatted_output, timings=run.summary()
+            )
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {e}")
+            self.store.update(
+                job_id, status=FAILED, finished_at=time.time(), error=f"Internal Processing Error: {str(e)}",
+                timings=run.summary()
+            )
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # The store itself failed; record what we can and keep the worker alive for the next job
+                logger.exception(f"Worker {index} could not process job {job_id}")
+                try:
+                    self.store.update(job_id, status=FAILED, finished_at=time.time(), error=f"Internal Processing Error: {str(e)}")
+                except Exception:
+                    logger.exception(f"Could not mark job {job_id} as failed")
+            finally:
+                self._queue.task_done()
+
+
+def make_job_store() -> JobStore:
+    """Build the job store selected by JOB_STORE (``memory`` or ``sqlite``)."""
+    kind = os.environ.get("JOB_STORE", "memory").lower()
+    retention = {
+        "retention_seconds": float(os.environ.get("JOB_RETENTION_SECONDS", 3600)),
+        "max_finished": int(os.environ.get("JOB_MAX_FINISHED", 1000)),
+    }
+    if kind == "memory":
+        return InMemoryJobStore(**retention)
+    if kind == "sqlite":
+        return SQLiteJobStore(os.environ.get("JOB_STORE_PATH", "jobs.db"), **retention)
+    raise ValueError(f"Unknown JOB_STORE: {kind}")
+
+
+def make_job_queue() -> CampaignJobQueue:
+    """Build the job queue using the JOB_* environment settings."""
+    return CampaignJobQueue(
+        store=make_job_store(),
+        workers=int(os.environ.get("JOB_WORKERS", 4)),
+        max_queued=int(os.environ.get("JOB_QUEUE_SIZE", 100)),
+    )
@@ -1,11 +1,50 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from routes.agent_router import router
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from agent import build_graph, get_graph, register_graph, unregister_graph
+from jobs.worker_pool import make_job_queue
+from utils.checkpoints import CheckpointRetention
+from utils.metrics import render_metrics
+
+# Checkpoints of failed runs stay resumable this long; those of successful runs are deleted right away
+CHECKPOINT_RETENTION_SECONDS = float(os.environ.get("CHECKPOINT_RETENTION_SECONDS", 24 * 3600))
+CHECKPOINT_SWEEP_SECONDS = 3600
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the workflow once at startup so no request pays for it
+    get_graph()
+    # Checkpointed runs can resume from their last completed step after a failure
+    async with AsyncSqliteSaver.from_conn_string(os.environ.get("CHECKPOINT_PATH", "checkpoints.db")) as checkpointer:
+        register_graph("checkpointed", build_graph(checkpointer=checkpointer))
+        app.state.checkpoints = CheckpointRetention(checkpointer, CHECKPOINT_RETENTION_SECONDS)
+        await app.state.checkpoints.setup()
+        sweeper = asyncio.create_task(app.state.checkpoints.sweep_periodically(CHECKPOINT_SWEEP_SECONDS))
+        app.state.job_queue = make_job_queue()
+        await app.state.job_queue.start()
+        yield
+        await app.state.job_queue.stop()
+        sweeper.cancel()
+        unregister_graph("checkpointed")
 
 
 app = FastAPI(
     title="Content Optimization Agent for User Generated Content",
     description="Includes a tool-powered LLM-based agentic system that provided content optimization strategies for users",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.include_router(router, prefix="/agent", tags=["Campaign"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-node and per-provider latency, queue time, retries, tokens and payload sizes."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,10 +1,28 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from agent import format_campaign_output, build_graph
-from schemas.state import CampaignState, Message
+import asyncio
+import json
+import os
+import uuid
+from typing import Optional
 
+from fastapi import APIRouter, Request, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from agent import format_campaign_output, get_graph, new_campaign_state
+from schemas.state import CampaignState
 
-from schemas.api_schemas import CampaignRequest, CampaignResponse
+
+from schemas.api_schemas import (
+    CampaignRequest, CampaignResponse,
+    BatchCampaignRequest, BatchCampaignResponse, BatchCampaignResult,
+    JobSubmitResponse, JobStatusResponse
+)
+from jobs.worker_pool import JobQueueFull
+from utils.shared_research import SharedResearch, current_research
+from utils.metrics import track_run
+from utils.checkpoints import resumable_run_config
+from configs.llm_config import get_llm_stats
+from utils.audio_artifacts import audio_store, in_flight_audio
+from utils.audio_stream import iter_file_range, parse_byte_range
 from configs.logging_config import setup_logging
 import logging
 setup_logging()
@@ -13,39 +31,194 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/query", response_model=CampaignResponse)
-def query_agent(request:CampaignRequest):
+async def query_agent(request:CampaignRequest, http_request:Request):
 
     try:
         if not request:
             return JSONResponse(content={"error": "Query is required"}, status_code=400)
         
+        # Each run is checkpointed under its run ID so a failed run can be resumed
+        run_id = uuid.uuid4().hex
+        checkpoints = http_request.app.state.checkpoints
         try:
-            initial_state = CampaignState(
-                campaign_theme="",
-                target_audience="",
-                duration_seconds=60,
-                tone="",
-                steps=[],
-                trends=[],
-                search_results=[],
-                hashtags=[],
-                script="",
-                production_ideas=[],
-                messages=[Message(role="user", content=request.prompt)],
-                current_step=""
-            )
+            initial_state = new_campaign_state(request.prompt)
 
-            graph = build_graph()
+            graph = get_graph("checkpointed")
 
-            result = graph.invoke(initial_state)
+            await checkpoints.started(run_id)
+            with track_run() as run:
+                result = await graph.ainvoke(initial_state, resumable_run_config(run_id))
+            await checkpoints.finished(run_id)
             final_state = CampaignState(**result)
             formatted_state = format_campaign_output(final_state)
             logger.info(f"\n------------Complete campaign description------------\n{formatted_state}")
-            return CampaignResponse(formatted_output=formatted_state)
+            return CampaignResponse(
+                formatted_output=formatted_state, run_id=run_id,
+                audio_artifact_id=final_state.audio_artifact_id, timings=run.summary()
+            )
         except Exception as e:
-            return JSONResponse(content={"error":f"Internal Processing Error, API endpoint entered but couldnt produce results! : {str(e)}"})
+            return JSONResponse(content={"error":f"Internal Processing Error, API endpoint entered but couldnt produce results! : {str(e)}", "run_id": run_id})
     except Exception as e:
         return JSONResponse(content={"error": "Internal Server Error, API endpoint not entered! HTTP Error"}, status_code=500)
-    
 
 
+@router.post("/query/{run_id}/resume", response_model=CampaignResponse)
+async def resume_query_agent(run_id:str, http_request:Request):
+    """Continue a failed checkpointed run from the step that failed instead of starting over.
+
+    Checkpoints are deleted once a run succeeds, and those of failed runs after
+    CHECKPOINT_RETENTION_SECONDS, so only failed runs can be resumed.
+    """
+    graph = get_graph("checkpointed")
+    config = resumable_run_config(run_id, resuming=True)
+    snapshot = await graph.aget_state(config)
+    if not snapshot.values:
+        return JSONResponse(content={"error": f"No resumable run with ID {run_id}"}, status_code=404)
+    try:
+        # Timings only cover the steps run by this call
+        with track_run() as run:
+            result = await graph.ainvoke(None, config) if snapshot.next else snapshot.values
+        await http_request.app.state.checkpoints.finished(run_id)
+        final_state = CampaignState(**result)
+        return CampaignResponse(
+            formatted_output=format_campaign_output(final_state), run_id=run_id,
+            audio_artifact_id=final_state.audio_artifact_id, timings=run.summary()
+        )
+    except Exception as e:
+        return JSONResponse(content={"error":f"Internal Processing Error while resuming run! : {str(e)}", "run_id": run_id})
+
+
+# Server-sent event names for the state delta each graph node produces
+NODE_EVENTS = {
+    "llm_router": "plan",
+    "trend_analyzer": "trends",
+    "search_engine": "search_results",
+    "hashtag_generator": "hashtags",
+    "script_generator": "script",
+    "tts_generator": "audio",
+}
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def _stream_campaign(prompt: str):
+    graph = get_graph()
+    final_values = None
+    try:
+        with track_run() as run:
+            async for mode, chunk in graph.astream(new_campaign_state(prompt), stream_mode=["updates", "custom", "values"]):
+                if mode == "values":
+                    final_values = chunk
+                elif mode == "updates":
+                    for node, delta in chunk.items():
+                        yield _sse(NODE_EVENTS.get(node, node), {"node": node, "delta": delta})
+                else:
+                    # Nodes push progress (e.g. script tokens) as {"event": ..., ...} through the stream writer
+                    yield _sse(chunk.get("event", "progress"), chunk)
+        final_state = CampaignState(**final_values)
+        yield _sse("complete", {"formatted_output": format_campaign_output(final_state), "timings": run.summary()})
+    except Exception as e:
+        logger.error(f"Error while streaming campaign: {e}")
+        yield _sse("error", {"error": f"Internal Processing Error while streaming results! : {str(e)}"})
+
+@router.post("/query/stream")
+async def stream_query_agent(request:CampaignRequest):
+    """Run a campaign and stream each workflow step as a server-sent event as soon as it completes."""
+    return StreamingResponse(
+        _stream_campaign(request.prompt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", 10))
+
+@router.post("/batch", response_model=BatchCampaignResponse)
+async def batch_query_agent(request:BatchCampaignRequest):
+    """Run many campaigns together, sharing trend, search and keyword lookups across the batch."""
+    graph = get_graph()
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def run(prompt: str) -> BatchCampaignResult:
+        async with semaphore:
+            try:
+                # Each campaign runs in its own task, so each gets its own timing breakdown
+                with track_run() as run:
+                    result = await graph.ainvoke(new_campaign_state(prompt))
+                return BatchCampaignResult(
+                    prompt=prompt, formatted_output=format_campaign_output(CampaignState(**result)), timings=run.summary()
+                )
+            except Exception as e:
+                logger.error(f"Error processing batch prompt '{prompt}': {e}")
+                return BatchCampaignResult(prompt=prompt, error=f"Internal Processing Error: {str(e)}")
+
+    # The campaigns run as tasks of this context, so they all see the same memo
+    research = SharedResearch()
+    token = current_research.set(research)
+    try:
+        results = await asyncio.gather(*(run(prompt) for prompt in request.prompts))
+    finally:
+        current_research.reset(token)
+
+    report = research.report()
+    logger.info(f"Batch of {len(request.prompts)} campaigns saved {report['external_calls_saved']} external calls")
+    return BatchCampaignResponse(results=results, **report)
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request:CampaignRequest, http_request:Request):
+    """Queue a campaign for the worker pool and return its job ID straight away."""
+    try:
+        job = http_request.app.state.job_queue.submit(request.prompt)
+    except JobQueueFull as e:
+        return JSONResponse(content={"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    return JobSubmitResponse(job_id=job.job_id, status=job.status)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id:str, http_request:Request):
+    """Poll a queued campaign; ``formatted_output`` is set once it has succeeded."""
+    job = http_request.app.state.job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": f"Job {job_id} not found"}, status_code=404)
+    return JobStatusResponse(**job.model_dump(exclude={"prompt"}))
+
+
+@router.get("/audio/{artifact_id}")
+async def get_audio(artifact_id:str, range_header:Optional[str] = Header(default=None, alias="Range")):
+    """Stream a generated voice-over by the artifact ID returned with the campaign.
+
+    Stored voice-overs support byte ranges. A voice-over that is still being
+    synthesized is streamed with chunked encoding as its chunks complete.
+    """
+    try:
+        path = audio_store.get(artifact_id)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    if path is None:
+        in_flight = in_flight_audio(artifact_id)
+        if in_flight is None:
+            return JSONResponse(content={"error": f"Audio {artifact_id} not found"}, status_code=404)
+        return StreamingResponse(in_flight.iter_wav(), media_type="audio/wav")
+
+    size = os.path.getsize(path)
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start + 1)}
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=206 if byte_range else 200,
+        media_type="audio/wav",
+        headers=headers
+    )
+
+
+@router.get("/llm-cache/stats")
+async def llm_cache_stats():
+    """Hit counts and hit rate of the LLM response cache per call site."""
+    return get_llm_stats()
@@ -1,7 +1,62 @@
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class CampaignRequest(BaseModel):
     prompt: str
 
+class NodeTiming(BaseModel):
+    count: int
+    seconds: float
+
+class ProviderTiming(BaseModel):
+    calls: int
+    errors: int
+    seconds: float
+    queue_seconds: float
+    retries: int
+    prompt_tokens: int
+    completion_tokens: int
+    sent_bytes: int
+    received_bytes: int
+
+class RunTimings(BaseModel):
+    """Where the time of one run went; nodes running in parallel can add up to more than the total."""
+    total_seconds: float
+    nodes: Dict[str, NodeTiming]
+    providers: Dict[str, ProviderTiming]
+
 class CampaignResponse(BaseModel):
     formatted_output: str
+    run_id: Optional[str] = None
+    audio_artifact_id: Optional[str] = None
+    timings: Optional[RunTimings] = None
+
+class BatchCampaignRequest(BaseModel):
+    prompts: List[str]
+
+class BatchCampaignResult(BaseModel):
+    prompt: str
+    formatted_output: Optional[str] = None
+    error: Optional[str] = None
+    timings: Optional[RunTimings] = None
+
+class BatchCampaignResponse(BaseModel):
+    results: List[BatchCampaignResult]
+    external_calls_requested: int
+    external_calls_made: int
+    external_calls_saved: int
+    saved_by_provider: Dict[str, int]
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    formatted_output: Optional[str] = None
+    error: Optional[str] = None
+    timings: Optional[RunTimings] = None
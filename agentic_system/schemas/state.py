@@ -1,5 +1,6 @@
-from typing import List, Dict, Union
-from typing_extensions import TypedDict
+import operator
+from typing import List, Dict, Optional, Union
+from typing_extensions import TypedDict, Annotated
 from pydantic import BaseModel
 
 class RelatedContent(BaseModel):
@@ -28,10 +29,11 @@ class Step(BaseModel):
     #     extra = 'forbid'
 
 class SearchItem(BaseModel):
+    # Only the fields some consumer declared are kept (see services.search_fields)
     title: str
-    content: str
-    url: str
-    score: float
+    content: str = ""
+    url: str = ""
+    score: float = 0.0
 
     # class Config:
     #     extra = 'forbid'  # In case Tavily returns more fields
@@ -44,8 +46,17 @@ class SearchResult(BaseModel):
     class Config:
         extra = 'forbid'
 
+def merge_steps(left: List[Step], right: List[Step]) -> List[Step]:
+    """Reducer for steps: merge by step name, a step stays executed once any writer marks it."""
+    merged = {step.step: step for step in left}
+    for step in right:
+        current = merged.get(step.step)
+        merged[step.step] = Step(step=step.step, executed=step.executed or (current is not None and current.executed))
+    return list(merged.values())
+
 class CampaignState(BaseModel):
-    messages: List[Message] 
+    # Append-only: nodes return just their new entries and the reducer concatenates
+    messages: Annotated[List[Message], operator.add]
     tone: str
     campaign_theme: str
     target_audience: str
@@ -56,7 +67,8 @@ class CampaignState(BaseModel):
     script: str
     current_step: str
     production_ideas: List[str]
-    steps: List[Step]
+    audio_artifact_id: Optional[str] = None
+    steps: Annotated[List[Step], merge_steps]
 
     # class Config:
     #     extra = "forbid"
@@ -2,23 +2,27 @@ from __future__ import annotations
 
 from langchain_core.tools import tool
 from schemas.state import CampaignState, Message, Step, SearchResult, SearchItem
+import asyncio
 import json
+import os
 from pydantic import BaseModel
 
 from typing import TYPE_CHECKING
 
 # if TYPE_CHECKING:
 from configs.llm_config import get_llm
+from utils.context_builder import build_search_context
 from configs.logging_config import setup_logging
 import logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+CONTEXT_TOKENS = int(os.environ.get("HASHTAG_CONTEXT_TOKENS", 300))
+
 class HashtagGeneratorInput(BaseModel):
     state: CampaignState
 
-@tool(args_schema=HashtagGeneratorInput)
-def hashtag_generator(state: CampaignState) -> dict:
+async def generate_hashtags(state: CampaignState) -> dict:
     """Generate relevant hashtags based on campaign theme, trends, and search results.
     
     Args:
@@ -28,6 +32,7 @@ def hashtag_generator(state: CampaignState) -> dict:
         Dict with 'hashtags' (List[str]) and 'messages' (List[dict]).
     """
     logger.info("Executing Hashtag Generation Step!")
+    new_messages = []
     llm = get_llm()
     theme = state.campaign_theme
     trends = state.trends
@@ -35,13 +40,10 @@ def hashtag_generator(state: CampaignState) -> dict:
 
     # Extract context
     trend_keywords = [trend.keyword for trend in trends]
-    search_terms = []
-    for result_set in search_results:
-        #result_set is of the type SearchResult
-        if result_set.term:
-            search_terms.append(result_set.term)
-        if result_set.results:
-            search_terms.extend(item.title for item in result_set.results[:3])
+    search_terms = [result_set.term for result_set in search_results if result_set.term]
+    # Best evidence for the theme, packed into a fixed token budget however many results came back
+    # (in a thread: ranking and tokenizing are blocking, see get_tokenizer)
+    evidence = await asyncio.to_thread(build_search_context, search_results, f"{theme} {state.target_audience}", CONTEXT_TOKENS)
 
     # for i in range(5):
     #     print(search_terms[i])
@@ -56,6 +58,7 @@ def hashtag_generator(state: CampaignState) -> dict:
         f"Campaign Theme: {theme}\n"
         f"Trend Keywords: {', '.join(trend_keywords)}\n"
         f"Search Terms: {', '.join(search_terms)}\n"
+        f"Search Evidence:\n{evidence or 'None'}\n"
         "Hashtags should be:\n"
         "1. Memorable and catchy\n"
         "2. Relevant to the theme\n"
@@ -65,9 +68,10 @@ def hashtag_generator(state: CampaignState) -> dict:
         "Return a JSON object with a 'hashtags' list of strings."
     )
     try:
-        response = llm.invoke(
-            [{"role": "system", "content": "Do not make any tool call whatsoever."},{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
+        response = await llm.ainvoke(
+            [{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            call_site="hashtag_generator"
         )
         # print("----------------LLM HAS RESPONDED----------------")
         # print(response)
@@ -83,7 +87,7 @@ def hashtag_generator(state: CampaignState) -> dict:
         logger.error(f"Error generating hashtags: {e}")
         words = theme.split()
         hashtags = ["#" + "".join(words), f"#{words[0]}Campaign"] if words else ["#Campaign"]
-        state.messages.append(Message(
+        new_messages.append(Message(
             role="assistant",
             content=f"Error generating hashtags: {e}. Using basic hashtags."
         ))
@@ -95,5 +99,11 @@ def hashtag_generator(state: CampaignState) -> dict:
 
     return {
         "hashtags": hashtags,
-        "messages": state.messages + [update_message]
+        "messages": new_messages + [update_message]
     }
+
+
+@tool(args_schema=HashtagGeneratorInput)
+async def hashtag_generator(state: CampaignState) -> dict:
+    """Generate relevant hashtags based on campaign theme, trends, and search results."""
+    return await generate_hashtags(state)
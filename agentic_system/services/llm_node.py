@@ -3,6 +3,7 @@ from __future__ import annotations
 from configs.llm_config import get_llm
 
 from schemas.state import CampaignState, Message, Step
+from typing import List
 import json
 from dotenv import load_dotenv
 load_dotenv()
@@ -12,7 +13,34 @@ import logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-def llm_router(state: CampaignState) -> dict:
+# Tools each step has to wait for. Only dependencies that were actually planned are
+# enforced, so steps without a pending dependency run in parallel.
+STEP_DEPENDENCIES = {
+    "trend_analyzer": [],
+    "search_engine": ["trend_analyzer"],
+    "hashtag_generator": ["trend_analyzer", "search_engine"],
+    # Scripts are written from the research alone, in parallel with the hashtags
+    "script_generator": ["trend_analyzer", "search_engine"],
+    "tts_generator": ["script_generator"],
+}
+
+def ready_steps(steps: List[Step]) -> List[str]:
+    """Return the unexecuted steps whose planned dependencies have all executed."""
+    planned = {s.step for s in steps}
+    executed = {s.step for s in steps if s.executed}
+    return [
+        s.step for s in steps
+        if not s.executed
+        and all(dep in executed for dep in STEP_DEPENDENCIES[s.step] if dep in planned)
+    ]
+
+def route_steps(state: CampaignState) -> List[str]:
+    """Conditional edge out of the router: fan out to every ready step, or end."""
+    if state.current_step == "END":
+        return ["END"]
+    return ready_steps(state.steps) or ["END"]
+
+async def llm_router(state: CampaignState) -> dict:
     """Dynamically route to the next tool or end, using steps in state."""
     llm = get_llm()
     if not state.current_step:
@@ -35,21 +63,26 @@ def llm_router(state: CampaignState) -> dict:
             # "Execute the tts tool for text to speech conversion ."
         )
         try:
-            response = llm.invoke([{"role": "user", "content": prompt}], response_format={"type": "json_object"})
+            response = await llm.ainvoke(
+                [{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                call_site="llm_router",
+                similarity_text=user_input
+            )
             #response_fromat in json string only works with gpt-40-mini and some snapshots, for other models, response_format is a string and not a json string
             # print(response) #✅ correct parsing of parameters
             result = json.loads(response.content) 
             # print(result) #✅ correct loading of json
             params = result.get("parameters", {})
-            steps = [
-                Step(step=s["step"], executed=False)
-                for s in result.get("steps", [])
-                if s.get("step") in ["trend_analyzer", "search_engine", "hashtag_generator", "script_generator", "tts_generator"]
-            ]
+            planned = dict.fromkeys(
+                s.get("step") for s in result.get("steps", [])
+                if s.get("step") in STEP_DEPENDENCIES
+            )
+            steps = [Step(step=name, executed=False) for name in planned]
             logging.info(steps) #✅ steps found
             if not params.get("campaign_theme"):
                 return {
-                    "messages": state.messages + [Message(role="assistant", content="Please provide a campaign theme.")],
+                    "messages": [Message(role="assistant", content="Please provide a campaign theme.")],
                     "current_step": "END"
                 }
             state_updates = {
@@ -58,37 +91,29 @@ def llm_router(state: CampaignState) -> dict:
                 "duration_seconds": params.get("duration_seconds", 60),
                 "tone": params.get("tone", "neutral"),
                 "steps": steps,
-                "messages": state.messages + [Message(role="system", content=f"Parameters: {params}, Steps: {steps}")],
-                "current_step": steps[0].step if steps else "END"
+                "messages": [Message(role="system", content=f"Parameters: {params}, Steps: {steps}")],
+                "current_step": ", ".join(ready_steps(steps)) or "END"
             }
             return state_updates
         except Exception as e:
             logger.error(f"Error extracting parameters or steps: {e}")
             return {
-                "messages": state.messages + [Message(role="assistant", content=f"Error initializing workflow: {e}")],
+                "messages": [Message(role="assistant", content=f"Error initializing workflow: {e}")],
                 "current_step": "END"
             }
 
-    # After a tool: mark current step as executed and find next step
-    steps = state.steps
-    # Mark current step as executed
-    for step in steps:
-        if step.step == state.current_step:
-            step.executed = True
-
-    # Find next unexecuted step
-    next_step = next((s.step for s in steps if not s.executed), None)
-    if next_step:
+    # After a batch of tools: the tools marked their own steps as executed, so
+    # dispatch every step that has become ready
+    next_steps = ready_steps(state.steps)
+    if next_steps:
         return {
-            "steps": steps,
-            "current_step": next_step
+            "current_step": ", ".join(next_steps)
         }
     
     logger.info("\n\nAll planned steps executed. Ending workflow.")
     return {
-        "steps": steps,
         "current_step": "END",
-        "messages": state.messages + [Message(role="system", content="All planned steps have been executed. Workflow complete.")]
+        "messages": [Message(role="system", content="All planned steps have been executed. Workflow complete.")]
     }
 
 
@@ -135,6 +160,6 @@ def llm_router(state: CampaignState) -> dict:
     #     print(f"Error in dynamic routing: {e}")
     #     return {
     #         "steps": steps,
-    #         "messages": state.messages + [Message(role="assistant", content=f"Error determining next step: {e}")],
+    #         "messages": [Message(role="assistant", content=f"Error determining next step: {e}")],
     #         "current_step": "END"
     #     }
\ No newline at end of file
@@ -0,0 +1,46 @@
+import importlib
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple
+
+from langchain_core.tools import BaseTool
+
+
+class ToolSpec(NamedTuple):
+    module: str
+    # The @tool object, for binding to an LLM
+    tool: str
+    # The plain coroutine graph nodes call on the already validated state
+    function: str
+
+
+# Tool modules (and the provider clients they create) are only imported when a
+# tool is first used, which keeps importing the app cheap.
+TOOLS: Dict[str, ToolSpec] = {
+    "trend_analyzer": ToolSpec("services.trend_tool", "trend_analyzer", "analyze_trends"),
+    "search_engine": ToolSpec("services.search_tool", "search_engine", "search_trends"),
+    "hashtag_generator": ToolSpec("services.hashtag_gen", "hashtag_generator", "generate_hashtags"),
+    "script_generator": ToolSpec("services.script_tool", "script_generator", "generate_script"),
+    "tts_generator": ToolSpec("services.tts_tool", "tts_generator", "generate_speech"),
+}
+
+
+def _spec(name: str) -> ToolSpec:
+    if name not in TOOLS:
+        raise ValueError(f"Unknown tool: {name}")
+    return TOOLS[name]
+
+
+@lru_cache(maxsize=None)
+def get_tool(name: str) -> BaseTool:
+    spec = _spec(name)
+    return getattr(importlib.import_module(spec.module), spec.tool)
+
+
+@lru_cache(maxsize=None)
+def get_tool_function(name: str) -> Callable:
+    spec = _spec(name)
+    return getattr(importlib.import_module(spec.module), spec.function)
+
+
+def get_tools() -> List[BaseTool]:
+    return [get_tool(name) for name in TOOLS]
@@ -1,38 +1,51 @@
 from __future__ import annotations
 
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableConfig
 from schemas.state import CampaignState, Message, Step, SearchItem, SearchResult
+import asyncio
 import json
+import os
 from pydantic import BaseModel
 from typing import TYPE_CHECKING
 
 # if TYPE_CHECKING:
 from configs.llm_config import get_llm
+from services.tts_tool import SpeechPrefetcher
+from utils.context_builder import build_search_context
 from configs.logging_config import setup_logging
+from utils.checkpoints import cache_responses, is_resumable
+from utils.json_stream import JsonObjectStreamParser
+from utils.stream_writer import stream_writer
 import logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+
+CONTEXT_TOKENS = int(os.environ.get("SCRIPT_CONTEXT_TOKENS", 600))
+
+def _has_script(content: str) -> bool:
+    """Whether a response is worth caching: a JSON object with a non-empty script."""
+    return bool(json.loads(content).get("script"))
+
 class ScriptGeneratorInput(BaseModel):
     state: CampaignState
 
-@tool(args_schema=ScriptGeneratorInput)
-def script_generator(state: CampaignState) -> dict:
+async def generate_script(state: CampaignState, config: RunnableConfig) -> dict:
     """Generate a script for the campaign based on collected data.
     
     Args:
-        state: CampaignState with campaign_theme, trends, search_results, hashtags, target_audience, duration_seconds.
+        state: CampaignState with campaign_theme, trends, search_results, target_audience, duration_seconds.
     
     Returns:
         Dict with 'script' (str), 'production_ideas' (List[str]), and 'messages' (List[dict]).
     """
     logger.info("Executing Script Generation ")
+    new_messages = []
     llm = get_llm()
     theme = state.campaign_theme
     trends = state.trends
     search_results = state.search_results
-    hashtags = state.hashtags
     audience = state.target_audience
     duration = state.duration_seconds
     tone = state.tone
@@ -42,19 +55,18 @@ def script_generator(state: CampaignState) -> dict:
     logger.info(f"Trend keywords gathered are: \n {trend_keywords}")
     search_terms = [r.term for r in search_results]
     logger.info(f"Search Terms gathered are: \n {search_terms}")
-    hashtags_text = ", ".join(hashtags) if hashtags else "None"
-    logger.info(f"Hashtags gathered are: \n {hashtags_text}")
+    # In a thread: ranking and tokenizing are blocking, see get_tokenizer
+    evidence = await asyncio.to_thread(build_search_context, search_results, f"{theme} {audience}", CONTEXT_TOKENS)
 
     # Generate script
     prompt = (
-        f"Carry all the steps without calling any tools that you have access to:\n\n"
         f"Create an engaging {duration}-second campaign script:\n"
         f"Campaign Theme: {theme}\n"
         f"Target Audience: {audience}\n"
         f"Tone: {tone}\n"
         f"Trends: {', '.join(trend_keywords) if trend_keywords else 'None'}\n"
         f"Search Insights: {', '.join(search_terms) if search_terms else 'None'}\n"
-        f"Hashtags: {hashtags_text}\n"
+        f"Search Evidence:\n{evidence or 'None'}\n"
         "Include:\n"
         "1. Engaging hook\n"
         "2. Persuasive messaging aligned with theme\n"
@@ -64,15 +76,31 @@ def script_generator(state: CampaignState) -> dict:
         "Also provide 2 production ideas (e.g., visuals, settings).\n"
         "Return a JSON object with 'script' as a string and 'production_ideas' as a list of strings."
     )
+    # Hand finished script chunks to speech synthesis early when the TTS step is planned
+    prefetcher = SpeechPrefetcher() if any(step.step == "tts_generator" for step in state.steps) else None
     try:
         logger.info("-----Generating script for the campaign----\n")
-        response = llm.invoke(
-            [{"role": "system", "content": "You are a helpful assistant, Do not make any tool call."}, {"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
-        # print("_____HASH INFO: LLM RESPONDED_____________")
-        # print(response)
-        result = json.loads(response.content)
+        # Stream the response so the script reaches callers while it is being written;
+        # the final values still come from parsing the complete JSON below
+        write = stream_writer(config)
+        parser = JsonObjectStreamParser()
+        chunks = []
+        async for chunk in llm.astream(
+            [{"role": "system", "content": "You are a helpful assistant."}, {"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            call_site="script_generator",
+            validate=_has_script,
+            cache_responses=cache_responses(config)
+        ):
+            chunks.append(chunk.content)
+            for field, kind, value in parser.feed(chunk.content):
+                if field == "script" and kind == "text":
+                    write({"event": "script_token", "text": value})
+                    if prefetcher:
+                        prefetcher.feed(value)
+                elif field == "production_ideas" and kind == "item":
+                    write({"event": "production_idea", "idea": value})
+        result = json.loads("".join(chunks))
         # print("_____HASH INFO: json content loaded_____________")
         # print(result)
         script = result.get("script", "")
@@ -81,12 +109,20 @@ def script_generator(state: CampaignState) -> dict:
         production_ideas = result.get("production_ideas", [])
         if not script:
             raise ValueError("Empty script generated")
+        if prefetcher:
+            prefetcher.finish(script)
         
     except Exception as e:
         logger.error(f"Error generating script: {e}")
+        if prefetcher:
+            # The chunks prefetched so far belong to a script that will not be spoken
+            prefetcher.cancel()
+        if is_resumable(config):
+            # Fail the step so resuming the run generates the script again
+            raise
         script = f"Script for {theme} campaign (fallback due to error)."
         production_ideas = ["Use vibrant visuals", "Highlight key product moments"]
-        state.messages.append(Message(
+        new_messages.append(Message(
             role="assistant",
             content=f"Error generating script: {e}. Using fallback script."
         ))
@@ -100,5 +136,11 @@ def script_generator(state: CampaignState) -> dict:
     return {
         "script": script,
         "production_ideas": production_ideas,
-        "messages": state.messages + [update_message]
-    }
\ No newline at end of file
+        "messages": new_messages + [update_message]
+    }
+
+
+@tool(args_schema=ScriptGeneratorInput)
+async def script_generator(state: CampaignState, config: RunnableConfig) -> dict:
+    """Generate a script for the campaign based on collected data."""
+    return await generate_script(state, config)
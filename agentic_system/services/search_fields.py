@@ -0,0 +1,13 @@
+from schemas.state import SearchItem
+from utils.projection import FieldProjection
+
+# SearchItem fields read by each consumer of search results; the search stage keeps
+# only their union (titles always). Declared here rather than in the consumer
+# modules because tool modules are imported lazily, possibly after the first search.
+search_fields = FieldProjection(SearchItem, always=("title",))
+
+# Hashtag and script prompts use ranked result titles and snippets as evidence
+search_fields.require("hashtag_generator", "title", "content")
+search_fields.require("script_generator", "title", "content")
+# The campaign overview shows the title, score and URL of the top search results
+search_fields.require("campaign_output", "title", "url", "score")
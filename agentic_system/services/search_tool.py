@@ -4,20 +4,147 @@ from schemas.state import CampaignState, Message, Step, SearchItem, SearchResult
 from typing import List
 import os
 from pydantic import BaseModel
-import time
+import asyncio
+import base64
+import json
+import re
+import zlib
 from dotenv import load_dotenv
 # load_dotenv()
 
 from configs.logging_config import setup_logging
+from utils.rate_limiter import get_rate_limiter
+from utils.cache import make_cache
+from utils.shared_research import shared_lookup
+from utils.metrics import concurrency_slot, provider_call
+from services.search_fields import search_fields
 import logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_SEARCHES = int(os.environ.get("TAVILY_MAX_CONCURRENCY", 5))
+
+# Cached results are served immediately while younger than the term's freshness
+# window, served and refreshed in the background while stale, and dropped
+# entirely once older than TAVILY_CACHE_MAX_AGE.
+FRESHNESS_SECONDS = float(os.environ.get("TAVILY_CACHE_FRESHNESS", 60 * 60))
+NEWS_FRESHNESS_SECONDS = float(os.environ.get("TAVILY_CACHE_NEWS_FRESHNESS", 15 * 60))
+NEWS_MARKERS = ("news", "latest", "today", "this week", "breaking", "live")
+
+search_cache = make_cache(
+    "tavily_results",
+    maxsize=int(os.environ.get("TAVILY_CACHE_SIZE", 2048)),
+    ttl=float(os.environ.get("TAVILY_CACHE_MAX_AGE", 24 * 60 * 60)),
+    path=os.environ.get("TAVILY_CACHE_PATH"),
+)
+# Background refreshes in flight, keyed by cache key; holding the task keeps it from being garbage collected
+_refreshing = {}
+
+# Raw page bodies and the generated answer are never read downstream, so they are not requested
+SEARCH_OPTIONS = {"max_results": 5, "include_answer": False, "include_raw_content": False}
+CONTENT_MAX_CHARS = int(os.environ.get("TAVILY_CONTENT_MAX_CHARS", 1000))
+
+
+def _freshness_window(term: str) -> float:
+    """Time-sensitive terms go stale sooner than evergreen ones."""
+    lowered = term.lower()
+    if any(marker in lowered for marker in NEWS_MARKERS) or re.search(r"\b20\d{2}\b", lowered):
+        return NEWS_FRESHNESS_SECONDS
+    return FRESHNESS_SECONDS
+
+
+def _search_cache_key(term: str) -> str:
+    # Results projected for a smaller field set must not be served when more fields are needed
+    return json.dumps(
+        [" ".join(term.lower().split()), SEARCH_OPTIONS, sorted(search_fields.fields()), CONTENT_MAX_CHARS],
+        sort_keys=True
+    )
+
+
+def _project(results_raw: list) -> list:
+    """Keep only the declared fields of each result, with content capped at CONTENT_MAX_CHARS."""
+    projected = []
+    for result in results_raw:
+        item = search_fields.project(result)
+        if "content" in item:
+            item["content"] = item["content"][:CONTENT_MAX_CHARS]
+        projected.append(item)
+    return projected
+
+
+def _pack(results_raw: list) -> str:
+    """Compress projected results for storage in the cache."""
+    return base64.b64encode(zlib.compress(json.dumps(results_raw).encode("utf-8"))).decode("ascii")
+
+
+def _unpack(packed: str) -> list:
+    return json.loads(zlib.decompress(base64.b64decode(packed)).decode("utf-8"))
+
+
+async def _fetch_results(tavily: TavilySearchResults, term: str) -> List[SearchItem]:
+    """Query Tavily for a term and store the raw results in the cache."""
+    await get_rate_limiter("tavily").acquire()
+    logger.info(f"Searching for: {term}")
+    query = f"latest information about {term}"
+    async with provider_call("tavily", "search") as call:
+        response = await tavily.ainvoke(query)
+        call.record_payload(sent=query, received=response)
+    results_raw = _project(response[:5]) #it was set five here
+    items = [SearchItem(**r) for r in results_raw]
+    search_cache.set(_search_cache_key(term), _pack(results_raw))
+    return items
+
+
+async def _refresh(tavily: TavilySearchResults, term: str, key: str):
+    try:
+        await _fetch_results(tavily, term)
+        logger.info(f"Refreshed cached search results for '{term}'")
+    except Exception as e:
+        logger.error(f"Background refresh failed for '{term}': {e}")
+    finally:
+        _refreshing.pop(key, None)
+
+
+def _schedule_refresh(tavily: TavilySearchResults, term: str, key: str):
+    if key not in _refreshing:
+        _refreshing[key] = asyncio.create_task(_refresh(tavily, term, key))
+
+
+async def _search_term(tavily: TavilySearchResults, term: str, semaphore: asyncio.Semaphore) -> tuple:
+    """Run the Tavily search for one term, serving it from the cache when possible.
+
+    Returns:
+        Tuple of the SearchResult, an error Message (None on success) and the
+        cache outcome: "fresh", "stale" or "miss".
+    """
+    key = _search_cache_key(term)
+    entry = search_cache.get_entry(key)
+    if entry is not None:
+        packed, age = entry
+        outcome = "fresh"
+        if age > _freshness_window(term):
+            outcome = "stale"
+            _schedule_refresh(tavily, term, key)
+        items = [SearchItem(**r) for r in _unpack(packed)]
+        return SearchResult(term=term, results=items), None, outcome
+
+    async with concurrency_slot("tavily", semaphore):
+        try:
+            # Identical terms from other campaigns of the same batch share one request
+            items = await shared_lookup("tavily", key, lambda: _fetch_results(tavily, term))
+            return SearchResult(term=term, results=items), None, "miss"
+        except Exception as e:
+            logger.error(f"Error searching for '{term}': {e}")
+            return SearchResult(term=term, results=[]), Message(
+                role="assistant",
+                content=f"Error searching for '{term}': {e}"
+            ), "miss"
+
+
 class SearchEngineInput(BaseModel):
     state: CampaignState
 
-@tool(args_schema=SearchEngineInput)
-def search_engine(state: CampaignState) -> dict:
+async def search_trends(state: CampaignState) -> dict:
     """Search for information on trends or campaign theme using Tavily. 
     
     Args:
@@ -27,6 +154,7 @@ def search_engine(state: CampaignState) -> dict:
         Dict with 'search_results' (List[dict]) and 'messages' (List[dict]).
     """
     logger.info("Executing the Web Search Tool !!")
+    new_messages = []
     trends = state.trends
     theme = state.campaign_theme
     tavily_api_key = os.environ.get("TAVILY_API_KEY")
@@ -36,7 +164,7 @@ def search_engine(state: CampaignState) -> dict:
         logger.error(error_msg)
         return {
             "search_results": [],
-            "messages": state.messages + [Message(role="assistant", content=error_msg)]
+            "messages": [Message(role="assistant", content=error_msg)]
         }
 
     #✅ Extract search terms
@@ -46,25 +174,22 @@ def search_engine(state: CampaignState) -> dict:
     search_results: List[SearchResult] = []
     # print(search_results)
 
-    tavily = TavilySearchResults(max_results=5, include_answer=True, include_raw_content=True)
-    
-    for term in search_terms:
-        try:
-            logger.info(f"Searching for: {term}")
-            results_raw = tavily.invoke(f"latest information about {term}")[:5] #it was set five here
-            # print(results_raw[0]) #✅
-            items = [SearchItem(**r) for r in results_raw]
-            # print(type(items)) #✅
-            # print(term)
-            search_results.append(SearchResult(term=term, results=items))
-            time.sleep(1)  # Avoid rate limits
-        except Exception as e:
-            logger.error(f"Error searching for '{term}': {e}")
-            search_results.append(SearchResult(term=term, error=str(e)))
-            state.messages.append(Message(
-                role="assistant",
-                content=f"Error searching for '{term}': {e}"
-            ))
+    tavily = TavilySearchResults(**SEARCH_OPTIONS)
+    # Bounds this campaign's fan-out; the shared limiter bounds the rate across all campaigns
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+    # gather keeps the results in the same order as the search terms
+    fetched = await asyncio.gather(*(_search_term(tavily, term, semaphore) for term in search_terms))
+    outcomes = {"fresh": 0, "stale": 0, "miss": 0}
+    for result, error_message, outcome in fetched:
+        search_results.append(result)
+        outcomes[outcome] += 1
+        if error_message:
+            new_messages.append(error_message)
+    new_messages.append(Message(
+        role="system",
+        content=f"Tavily search cache: {outcomes['fresh']} fresh hits, {outcomes['stale']} stale hits, {outcomes['miss']} misses."
+    ))
 
     # print(search_results)
 
@@ -75,10 +200,16 @@ def search_engine(state: CampaignState) -> dict:
 
     return {
         "search_results": search_results,
-        "messages": state.messages + [update_message]
+        "messages": new_messages + [update_message]
     }
 
 
+@tool(args_schema=SearchEngineInput)
+async def search_engine(state: CampaignState) -> dict:
+    """Search for information on trends or campaign theme using Tavily."""
+    return await search_trends(state)
+
+
 """
 SearchItem(
     title='40 Sustainable Clothing Brands To Know in 2024 - The Trend Spotter', content='Discover some of the most popular eco-friendly',
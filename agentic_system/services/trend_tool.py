@@ -6,7 +6,7 @@ from langchain_core.tools import tool
 from schemas.state import CampaignState, Message, Step
 from serpapi.google_search import GoogleSearch
 import os
-import time
+import asyncio
 import json
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -19,12 +19,114 @@ logger = logging.getLogger(__name__)
 
 
 from configs.llm_config import get_llm
+from utils.rate_limiter import get_rate_limiter
+from utils.cache import make_cache
+from utils.shared_research import shared_lookup
+from utils.metrics import provider_call
+
+# Trend lookups for the same keyword are reused across campaigns until they expire
+trend_cache = make_cache(
+    "serpapi_trends",
+    maxsize=int(os.environ.get("SERPAPI_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("SERPAPI_CACHE_TTL", 6 * 60 * 60)),
+    path=os.environ.get("SERPAPI_CACHE_PATH"),
+)
+
+
+class SerpApiError(Exception):
+    """SerpAPI answered without results; its client reports errors in the payload instead of raising."""
+
+
+def _trend_cache_key(keyword: str, engine: str, location: str) -> str:
+    return json.dumps([" ".join(keyword.lower().split()), engine, location.lower()])
+
+
+async def _query_trend(keyword: str, params: dict) -> dict:
+    """Call SerpAPI for one keyword and derive its trend info."""
+    search = GoogleSearch(params)
+
+    await get_rate_limiter("serpapi").acquire()
+    async with provider_call("serpapi", "trends") as call:
+        # SerpAPI only ships a blocking client, so keep it off the event loop
+        results = await asyncio.to_thread(search.get_dict)
+        call.record_payload(sent=keyword, received=results)
+        # e.g. {"error": "Your account has run out of searches."}; never cache these as trends
+        if "error" in results:
+            raise SerpApiError(results["error"])
+        if "organic_results" not in results:
+            raise SerpApiError("No organic results in the response")
+
+    trend_info = {"keyword": keyword, "relevance": 100}
+    
+    # Extract organic results
+    if "organic_results" in results and results["organic_results"]:
+        top_results = results["organic_results"][:3]
+        trend_info["related_content"] = [
+            {"title": r["title"], "snippet": r["snippet"]}
+            for r in top_results if "title" in r and "snippet" in r
+        ]
+        
+        # Extract related queries from sitelinks
+        related_queries = []
+        if top_results and "sitelinks" in top_results[0] and "inline" in top_results[0]["sitelinks"]:
+            related_queries = [
+                s["title"] for s in top_results[0]["sitelinks"]["inline"][:3] if "title" in s
+            ]
+        trend_info["related_queries"] = related_queries
+
+
+    # Trend direction heuristic
+    trend_direction = "neutral"
+    if "organic_results" in results:
+        mention_count = sum(
+            1 for r in results["organic_results"][:5]
+            if "snippet" in r and keyword.lower() in r["snippet"].lower()
+        )
+        trend_direction = "increasing" if mention_count > 3 else "decreasing" if mention_count < 2 else "neutral"
+    trend_info["trend_direction"] = trend_direction
+
+    return trend_info
+
+
+async def _fetch_trend(keyword: str, serpapi_key: str) -> tuple:
+    """Look up a single keyword on SerpAPI and derive its trend info.
+
+    Returns:
+        Tuple of the trend info dict, an error Message (None on success) and
+        whether the lookup was served from the cache.
+    """
+    try:
+        params = {
+            "engine": "google_light",
+            "q": keyword,
+            "location": "United States",
+            "api_key": serpapi_key
+        }
+
+        cache_key = _trend_cache_key(keyword, params["engine"], params["location"])
+        cached = trend_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Trend cache hit for '{keyword}'")
+            return {**cached, "keyword": keyword}, None, True
+
+        # Identical keywords from other campaigns of the same batch share one request
+        trend_info = await shared_lookup("serpapi", cache_key, lambda: _query_trend(keyword, params))
+        trend_info = {**trend_info, "keyword": keyword}
+        trend_cache.set(cache_key, trend_info)
+        logger.info("Trends have been analyzed successfully!! ✅")
+        return trend_info, None, False
+    except Exception as e:
+        print(f"Error processing keyword '{keyword}': {e}")
+        return {"keyword": keyword, "error": str(e)}, Message(
+            role="assistant",
+            content=f"Error fetching trends for '{keyword}': {e}"
+        ), False
+
 
 class TrendAnalyzerInput(BaseModel):
     state: CampaignState
 
-@tool(args_schema=TrendAnalyzerInput)
-def trend_analyzer(state: CampaignState) -> dict:
+async def analyze_trends(state: CampaignState) -> dict:
     """Fetch trends related to the campaign theme using SerpAPI and LLM-generated keywords.
     
     Args:
@@ -34,6 +136,7 @@ def trend_analyzer(state: CampaignState) -> dict:
         Dict with 'trends' (List[dict]) and 'messages' (List[dict]) for state update.
     """
     logger.info("Executing the Trend Analyzer tool")
+    new_messages = []
     llm = get_llm()
     theme = state.campaign_theme
     serpapi_key = os.environ.get("NEW_SERPAPI_KEY")
@@ -42,7 +145,7 @@ def trend_analyzer(state: CampaignState) -> dict:
         print(error_msg)
         return {
             "trends": [{"keyword": theme, "error": "Missing API key"}],
-            "messages": state.messages + [Message(role="assistant", content=error_msg)]
+            "messages": [Message(role="assistant", content=error_msg)]
         }
 
     # Generate keywords using LLM with structured output
@@ -51,78 +154,42 @@ def trend_analyzer(state: CampaignState) -> dict:
         "for searching trends. Return a JSON object with a 'keywords' list of strings."
     )
     try:
-        response = llm.invoke(
-            [{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
+        # Campaigns of the same batch with the same theme share one keyword request
+        response = await shared_lookup(
+            "openai",
+            f"trend_keywords:{' '.join(theme.lower().split())}",
+            lambda: llm.ainvoke(
+                [{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                call_site="trend_analyzer",
+                similarity_text=theme
+            )
         )
         # print(response)
         keywords = json.loads(response.content).get("keywords", [theme])
     except Exception as e:
         logger.error(f"Error generating keywords: {e}")
         keywords = [theme]
-        state.messages.append({
-            "role": "assistant",
-            "content": f"Failed to generate keywords for '{theme}'. Using theme as keyword."
-        })
-
-    # Fetch trends via SerpAPI
+        new_messages.append(Message(
+            role="assistant",
+            content=f"Failed to generate keywords for '{theme}'. Using theme as keyword."
+        ))
+
+    # Fetch trends via SerpAPI, all keywords at once; the shared limiter spaces out the calls
+    fetched = await asyncio.gather(*(
+        _fetch_trend(keyword, serpapi_key) for keyword in keywords[:5]  # Limit to 5 keywords
+    ))
     trends_data = []
-    for keyword in keywords[:5]:  # Limit to 5 keywords
-        try:
-            params = {
-                "engine": "google_light",
-                "q": keyword,
-                "location": "United States",
-                "api_key": serpapi_key
-            }
-
-            search = GoogleSearch(params)
-
-            results = search.get_dict()
-
-            trend_info = {"keyword": keyword, "relevance": 100}
-            
-            # Extract organic results
-            if "organic_results" in results and results["organic_results"]:
-                top_results = results["organic_results"][:3]
-                trend_info["related_content"] = [
-                    {"title": r["title"], "snippet": r["snippet"]}
-                    for r in top_results if "title" in r and "snippet" in r
-                ]
-                
-                # Extract related queries from sitelinks
-                related_queries = []
-                if top_results and "sitelinks" in top_results[0] and "inline" in top_results[0]["sitelinks"]:
-                    related_queries = [
-                        s["title"] for s in top_results[0]["sitelinks"]["inline"][:3] if "title" in s
-                    ]
-                trend_info["related_queries"] = related_queries
-
-
-            # Trend direction heuristic
-            trend_direction = "neutral"
-            if "organic_results" in results:
-                mention_count = sum(
-                    1 for r in results["organic_results"][:5]
-                    if "snippet" in r and keyword.lower() in r["snippet"].lower()
-                )
-                trend_direction = "increasing" if mention_count > 3 else "decreasing" if mention_count < 2 else "neutral"
-            trend_info["trend_direction"] = trend_direction
-
-            trends_data.append(trend_info)
-            logger.info("Trends have been analyzed successfully!! ✅")
-            time.sleep(1)  # Avoid rate limits
-        except Exception as e:
-            print(f"Error processing keyword '{keyword}': {e}")
-            trends_data.append({"keyword": keyword, "error": str(e)})
-            # state.messages.append({
-            #     "role": "assistant",
-            #     "content": f"Error fetching trends for '{keyword}': {e}"
-            # })
-            state.messages.append(Message(
-                role="assistant",
-                content=f"Error fetching trends for '{keyword}': {e}"
-            ))
+    cache_hits = 0
+    for trend_info, error_message, cache_hit in fetched:
+        trends_data.append(trend_info)
+        cache_hits += cache_hit
+        if error_message:
+            new_messages.append(error_message)
+    new_messages.append(Message(
+        role="system",
+        content=f"SerpAPI trend cache: {cache_hits} hits, {len(fetched) - cache_hits} misses."
+    ))
 
     # Update state
     update_message = Message(
@@ -131,5 +198,11 @@ def trend_analyzer(state: CampaignState) -> dict:
     )
     return {
         "trends": trends_data,
-        "messages": state.messages + [update_message]
-    }
\ No newline at end of file
+        "messages": new_messages + [update_message]
+    }
+
+
+@tool(args_schema=TrendAnalyzerInput)
+async def trend_analyzer(state: CampaignState) -> dict:
+    """Fetch trends related to the campaign theme using SerpAPI and LLM-generated keywords."""
+    return await analyze_trends(state)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
 from schemas.state import CampaignState, Message
 from pydantic import BaseModel
 
@@ -10,50 +11,180 @@ import logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-from google import genai
-from google.genai import types
-import pyaudio
-import base64
-
 import traceback
+import asyncio
+import hashlib
+import json
 import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.script_chunks import split_script
+from utils.artifact_store import ArtifactStore
+from utils.audio_artifacts import audio_store, end_in_flight, start_in_flight
+from utils.stream_writer import stream_writer
+from utils.checkpoints import is_resumable
+from utils.metrics import concurrency_slot, provider_call
 
 from dotenv import load_dotenv
 load_dotenv()
 
-try:
-    gemini_key = os.getenv("GEMINI_API_KEY")
-except:
-    print("GEMINI API KEY CANNOT BE FETCHED! ")
+_client = None
 
-client = genai.Client(api_key=gemini_key)
+def get_client():
+    """The Gemini client, created (and google.genai imported) on first use."""
+    global _client
+    if _client is None:
+        from google import genai
+        _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
 
 import wave
 
 # Set up the wave file to save the output:
 def wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
+   # pcm may also be a sequence of buffers, written in order without joining them first
+   chunks = [pcm] if isinstance(pcm, (bytes, bytearray, memoryview)) else pcm
    with wave.open(filename, "wb") as wf:
       wf.setnchannels(channels)
       wf.setsampwidth(sample_width)
       wf.setframerate(rate)
-      wf.writeframes(pcm)
+      for chunk in chunks:
+         wf.writeframes(chunk)
+
+
+TTS_MODEL = "gemini-2.5-flash-preview-tts"
+TTS_VOICE = "Kore"
+# Every chunk gets the same instruction and voice so the delivery stays consistent across chunks
+TTS_PROMPT = "TTS the following script for a marketing campaign. Make it sound like you are a person pitching the idea of the script! SCRIPT:\n {script}"
+CHUNK_CHARS = int(os.environ.get("TTS_CHUNK_CHARS", 400))
+MAX_CONCURRENT_CHUNKS = int(os.environ.get("TTS_MAX_CONCURRENCY", 4))
+PREFETCH_TTL = 10 * 60
+
+
+def audio_artifact_id(script: str) -> str:
+    return ArtifactStore.artifact_id(script, TTS_VOICE, TTS_MODEL)
+
+
+# Chunk syntheses started while the script was still being generated, keyed by
+# chunk text, voice and model; the TTS step takes them over instead of starting again
+_prefetched: Dict[str, Tuple[asyncio.Future, float]] = {}
+# The concurrency limit of each prefetching campaign, keyed by the artifact ID of its final
+# script, so its TTS step starts the remaining chunks under the same MAX_CONCURRENT_CHUNKS
+_prefetch_semaphores: Dict[str, Tuple[asyncio.Semaphore, float]] = {}
+
+
+def _chunk_key(text: str) -> str:
+    return hashlib.sha256(json.dumps([text, TTS_VOICE, TTS_MODEL]).encode("utf-8")).hexdigest()
+
+
+async def _synthesize_chunk(text: str, semaphore: asyncio.Semaphore) -> bytes:
+    """Synthesize one script chunk; returns 24 kHz 16-bit mono PCM."""
+    from google.genai import types
+    contents = TTS_PROMPT.format(script=text)
+    async with concurrency_slot("gemini", semaphore), provider_call("gemini", "tts") as call:
+        response = await get_client().aio.models.generate_content(
+            model=TTS_MODEL,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                response_modalities=["AUDIO"],
+                speech_config=types.SpeechConfig(
+                    voice_config=types.VoiceConfig(
+                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                            voice_name=TTS_VOICE
+                        )
+                    )
+                ),
+            )
+        )
+        pcm = response.candidates[0].content.parts[0].inline_data.data
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            call.record_tokens(usage.prompt_token_count, usage.candidates_token_count)
+        call.record_payload(sent=contents, received=pcm)
+    return pcm
+
+
+def _take_prefetched(text: str) -> Optional[asyncio.Future]:
+    entry = _prefetched.pop(_chunk_key(text), None)
+    return entry[0] if entry else None
+
+
+def _take_semaphore(artifact_id: str) -> asyncio.Semaphore:
+    entry = _prefetch_semaphores.pop(artifact_id, None)
+    return entry[0] if entry else asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+
+class SpeechPrefetcher:
+    """Starts synthesizing script chunks while the script is still being streamed.
+
+    ``feed`` takes script text as it arrives; each chunk is started as soon as a
+    later boundary shows it is complete. ``finish`` starts whatever is left of the
+    final script, and ``cancel`` drops the prefetches when there is no script to speak.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._started = 0
+        self._futures = []
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    def _start(self, chunks):
+        now = time.time()
+        for registry in (_prefetched, _prefetch_semaphores):
+            for key in [key for key, (_, started_at) in registry.items() if now - started_at > PREFETCH_TTL]:
+                del registry[key]
+        for text in chunks:
+            key = _chunk_key(text)
+            if key not in _prefetched:
+                future = asyncio.ensure_future(_synthesize_chunk(text, self._semaphore))
+                # Retrieve the error of a prefetch nobody ends up awaiting so it is not reported as unhandled
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                _prefetched[key] = (future, now)
+                self._futures.append((key, future))
+
+    def feed(self, text: str):
+        self._text += text
+        # Chunk boundaries can only appear after sentence punctuation or at a timing marker
+        if not any(char in text for char in ".!?…]"):
+            return
+        chunks = split_script(self._text, CHUNK_CHARS)[:-1]
+        self._start(chunks[self._started:])
+        self._started = max(self._started, len(chunks))
+
+    def cancel(self):
+        for key, future in self._futures:
+            future.cancel()
+            _prefetched.pop(key, None)
+        self._futures = []
+
+    def finish(self, script: str):
+        artifact_id = audio_artifact_id(script)
+        if audio_store.get(artifact_id) is not None:
+            # The voice-over already exists; a script replayed from the LLM cache arrives in one
+            # piece, so these futures are cancelled before they have sent any request
+            self.cancel()
+            return
+        self._start(split_script(script, CHUNK_CHARS)[self._started:])
+        _prefetch_semaphores[artifact_id] = (self._semaphore, time.time())
 
 
 class ttsInput(BaseModel):
     state: CampaignState
 
-@tool(args_schema = ttsInput)
-def tts_generator(state: CampaignState) -> dict:
+async def generate_speech(state: CampaignState, config: Optional[RunnableConfig] = None) -> dict:
     """Provides text to speech for the script generated for the campaign.
     
     Args:
         state: CampaignState with campaign_theme, trends, search_results, hashtags, target_audience, duration_seconds, and script.
 
     Returns:
-    Dict with 'messages' (List[dict]) for state update.
+    Dict with 'audio_artifact_id' (str or None) and 'messages' (List[dict]) for state update.
     """
 
     script = state.script
+    new_messages = []
+    artifact_id = None
     # script = f"""
     # TITLE: Shoes So Cool, Even Your Crusty Ex Will Notice
 
@@ -90,32 +221,30 @@ def tts_generator(state: CampaignState) -> dict:
     # """
 
     try:
-        prompt = f"""TTS the following script for a marketing campaign. Make it sound like you are a person pitching the idea of the script! SCRIPT:\n {script}"""
-        
         logger.info("Executing the tts tool")
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-tts",  # Use full model path
-            contents= prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=["AUDIO"],
-                speech_config=types.SpeechConfig(
-                    voice_config=types.VoiceConfig(
-                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name="Kore"
-                        )
-                    )
-                ),
-            )
-        )
-        logger.info("GEMINI TTS service has responded")
-        # print(response)
-
-        # Decode base64 audio data
-        audio_data_b64 = response.candidates[0].content.parts[0].inline_data.data
+        artifact_id = audio_artifact_id(script)
+        if audio_store.get(artifact_id) is not None:
+            logger.info(f"Reusing stored voice-over {artifact_id}")
+        else:
+            # Synthesize scene-sized chunks concurrently, picking up chunks already
+            # started while the script was streamed, and keep the PCM in script order
+            chunks = split_script(script, CHUNK_CHARS)
+            # Shared with the campaign's prefetches, if any, so they count against the same limit
+            semaphore = _take_semaphore(artifact_id)
+            futures = [
+                _take_prefetched(text) or asyncio.ensure_future(_synthesize_chunk(text, semaphore)) for text in chunks
+            ]
+            # Clients can start downloading (and playing) the voice-over while it is synthesized
+            in_flight = start_in_flight(artifact_id, futures)
+            stream_writer(config)({"event": "audio_started", "audio_artifact_id": artifact_id})
+            try:
+                pcm_chunks = await asyncio.gather(*futures)
+                logger.info(f"GEMINI TTS service has responded for {len(pcm_chunks)} chunks")
 
-        file_name='out.wav'
-        wave_file(file_name, audio_data_b64)
-        logger.info("WAV file has been saved successfully")  
+                await asyncio.to_thread(audio_store.put, artifact_id, lambda path: wave_file(path, pcm_chunks))
+                logger.info(f"WAV file has been saved successfully as artifact {artifact_id}")
+            finally:
+                end_in_flight(artifact_id, in_flight)
 
         # logger.info("Base 64 data extracted")
         # print(audio_data_b64)
@@ -148,16 +277,28 @@ def tts_generator(state: CampaignState) -> dict:
     except Exception as e:
         traceback.print_exc()
         logger.error(f"Error encountered for tts")
-        state.messages.append(Message(
+        if is_resumable(config):
+            # Fail the step so resuming the run synthesizes the voice-over again
+            raise
+        artifact_id = None
+        new_messages.append(Message(
             role="assistant",
             content=f"Error generating script: {e}. Using fallback script."
         ))
 
     update_message = Message(
         role="assistant",
-        content=f"Coverted the script text to speech for the campaign, saved as out.wav file!"
+        content=f"Coverted the script text to speech for the campaign, saved as audio artifact {artifact_id}!"
+        if artifact_id else "No audio was generated for the campaign."
     )
 
     return {
-        "messages": state.messages + [update_message]
-    }
\ No newline at end of file
+        "audio_artifact_id": artifact_id,
+        "messages": new_messages + [update_message]
+    }
+
+
+@tool(args_schema = ttsInput)
+async def tts_generator(state: CampaignState, config: RunnableConfig) -> dict:
+    """Provides text to speech for the script generated for the campaign."""
+    return await generate_speech(state, config)
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Callable, Optional
+
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ArtifactStore:
+    """Content-addressed files in a directory, bounded in total size.
+
+    Artifact IDs are hashes of whatever determines the content, so producing the
+    same content twice resolves to the same file. Files are written to a temporary
+    name and renamed into place, so readers never see a partial artifact. Once the
+    directory holds more than ``max_bytes``, the least recently used artifacts are
+    evicted (reads refresh an artifact's modification time).
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def artifact_id(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def path(self, artifact_id: str) -> str:
+        if not _ARTIFACT_ID.match(artifact_id):
+            raise ValueError(f"Invalid artifact ID: {artifact_id}")
+        return os.path.join(self.directory, artifact_id + self.suffix)
+
+    def get(self, artifact_id: str) -> Optional[str]:
+        """Path of a stored artifact, or None."""
+        path = self.path(artifact_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, artifact_id: str, write: Callable[[str], None]) -> str:
+        """Store an artifact by calling ``write`` with a temporary path, then moving it into place."""
+        path = self.path(artifact_id)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(self.suffix) and not entry.name.startswith(".tmp-"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,58 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from utils.artifact_store import ArtifactStore
+from utils.audio_stream import CHUNK_SIZE, STREAMING_DATA_SIZE, wav_header
+
+# Kept apart from the TTS tool so the audio routes can serve voice-overs without importing it at startup
+
+# Finished voice-overs, addressed by hash(script, voice, model) so an unchanged script is never synthesized twice
+audio_store = ArtifactStore(
+    os.environ.get("ARTIFACT_DIR", "artifacts"),
+    max_bytes=int(os.environ.get("ARTIFACT_MAX_BYTES", 1024 ** 3)),
+    suffix=".wav",
+)
+
+
+class InFlightAudio:
+    """A voice-over whose chunks are still being synthesized.
+
+    Downloads started before the artifact is stored read the PCM of each chunk as
+    soon as it (and every chunk before it) is ready; they all share the same buffers.
+    """
+
+    def __init__(self, chunks: List[asyncio.Future]):
+        self.chunks = chunks
+
+    async def iter_wav(self):
+        yield wav_header(STREAMING_DATA_SIZE)
+        for future in self.chunks:
+            # Shielded so a client disconnecting does not cancel the synthesis
+            pcm = memoryview(await asyncio.shield(future))
+            for offset in range(0, len(pcm), CHUNK_SIZE):
+                yield pcm[offset:offset + CHUNK_SIZE]
+
+# Voice-overs being synthesized, by artifact ID, until they are in the artifact store. Campaigns
+# with the same script synthesize the same artifact, so each of them registers its own entry
+_in_flight: Dict[str, List[InFlightAudio]] = {}
+
+
+def in_flight_audio(artifact_id: str) -> Optional[InFlightAudio]:
+    entries = _in_flight.get(artifact_id)
+    return entries[0] if entries else None
+
+
+def start_in_flight(artifact_id: str, chunks: List[asyncio.Future]) -> InFlightAudio:
+    entry = InFlightAudio(chunks)
+    _in_flight.setdefault(artifact_id, []).append(entry)
+    return entry
+
+
+def end_in_flight(artifact_id: str, entry: InFlightAudio):
+    """Unregister one campaign's entry; the artifact stays in flight while another campaign still synthesizes it."""
+    entries = _in_flight.get(artifact_id, [])
+    if entry in entries:
+        entries.remove(entry)
+    if not entries:
+        _in_flight.pop(artifact_id, None)
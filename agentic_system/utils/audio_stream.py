@@ -0,0 +1,54 @@
+import mmap
+import re
+import struct
+from typing import Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+# Data size announced by a WAV header whose length is not known yet
+STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def wav_header(data_size: int, channels: int = 1, rate: int = 24000, sample_width: int = 2) -> bytes:
+    """Canonical 44-byte PCM WAV header."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE", b"fmt ", 16, 1, channels, rate,
+        rate * channels * sample_width, channels * sample_width, sample_width * 8, b"data", data_size,
+    )
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into inclusive ``(start, end)`` offsets.
+
+    Returns None when the whole file should be sent (no header, or a form that is
+    not supported such as multiple ranges) and raises ValueError when the range
+    cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _BYTE_RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield bytes ``start..end`` (inclusive) of a file through a read-only memory map.
+
+    Every download maps the same file, so they all read from the shared page
+    cache and only one chunk per download is copied out at a time.
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(start, end + 1, chunk_size):
+            yield mapped[offset:min(offset + chunk_size, end + 1)]
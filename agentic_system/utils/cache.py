@@ -0,0 +1,124 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, age_seconds)`` for a live entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, age
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCache:
+    """On-disk cache tier with the same interface as TTLCache; values must be JSON-serializable."""
+
+    def __init__(self, path: str, maxsize: int, ttl: float, table: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            age = now - row[1]
+            with self._conn:
+                if age > self.ttl:
+                    self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                    return None
+                self._conn.execute(f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0]), age
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), stored_at if stored_at is not None else now, now),
+            )
+            # Evict least recently used rows beyond the size bound
+            self._conn.execute(
+                f"DELETE FROM {self._table} WHERE key NOT IN "
+                f"(SELECT key FROM {self._table} ORDER BY accessed_at DESC LIMIT ?)",
+                (self.maxsize,),
+            )
+
+
+class TieredCache:
+    """In-memory LRU tier in front of an optional on-disk tier."""
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self.memory.get_entry(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                # Promote to memory, keeping the original age so the TTL still holds
+                value, age = entry
+                self.memory.set(key, value, stored_at=time.time() - age)
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+
+def make_cache(name: str, maxsize: int, ttl: float, path: Optional[str] = None) -> TieredCache:
+    """Build a tiered cache; the disk tier is only added when a SQLite path is given."""
+    disk = SQLiteCache(path, maxsize=maxsize, ttl=ttl, table=name) if path else None
+    return TieredCache(TTLCache(maxsize=maxsize, ttl=ttl), disk)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+
+def resumable_run_config(thread_id: str, resuming: bool = False) -> dict:
+    """Config for a checkpointed run that can be resumed after a failed step.
+
+    In a resumable run the script and speech steps raise on provider errors instead
+    of falling back, so the failed step is left unexecuted in the checkpoint and
+    resuming the thread runs it again. When ``resuming``, the retried steps skip the
+    LLM response cache, so a step that failed on what the model answered gets a
+    fresh answer.
+    """
+    configurable = {"thread_id": thread_id, "resumable": True}
+    if resuming:
+        configurable["cache_responses"] = False
+    return {"configurable": configurable}
+
+
+def is_resumable(config: Optional[RunnableConfig]) -> bool:
+    return bool((config or {}).get("configurable", {}).get("resumable"))
+
+
+def cache_responses(config: Optional[RunnableConfig]) -> bool:
+    """Whether LLM calls of this run may be answered from the response cache."""
+    return (config or {}).get("configurable", {}).get("cache_responses", True)
+
+
+class CheckpointRetention:
+    """Removes the checkpoints of runs that no longer need them.
+
+    A run's checkpoints are deleted as soon as it succeeds; those of failed runs are
+    kept for ``retention_seconds`` so they can be resumed, and then swept. The start
+    time of every checkpointed run is kept in a table next to the checkpoints.
+
+    Statements go through the checkpointer's single aiosqlite connection and its
+    lock, like every checkpoint write: all writes of all checkpointed runs in this
+    process are serialized on that connection.
+    """
+
+    def __init__(self, checkpointer, retention_seconds: float):
+        self.checkpointer = checkpointer
+        self.retention_seconds = retention_seconds
+
+    async def _execute(self, sql: str, parameters: tuple = ()) -> list:
+        await self.checkpointer.setup()
+        async with self.checkpointer.lock, self.checkpointer.conn.execute(sql, parameters) as cursor:
+            rows = await cursor.fetchall()
+            await self.checkpointer.conn.commit()
+            return list(rows)
+
+    async def setup(self):
+        await self._execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_runs (thread_id TEXT PRIMARY KEY, started_at REAL NOT NULL)"
+        )
+
+    async def started(self, thread_id: str):
+        await self._execute(
+            "INSERT OR IGNORE INTO checkpoint_runs (thread_id, started_at) VALUES (?, ?)", (thread_id, time.time())
+        )
+
+    async def finished(self, thread_id: str):
+        """Drop the checkpoints of a run that succeeded; it has nothing left to resume."""
+        await self.checkpointer.adelete_thread(thread_id)
+        await self._execute("DELETE FROM checkpoint_runs WHERE thread_id = ?", (thread_id,))
+
+    async def sweep(self) -> int:
+        """Delete the checkpoints of runs started more than ``retention_seconds`` ago."""
+        rows = await self._execute(
+            "SELECT thread_id FROM checkpoint_runs WHERE started_at < ?", (time.time() - self.retention_seconds,)
+        )
+        for (thread_id,) in rows:
+            await self.finished(thread_id)
+        if rows:
+            logger.info(f"Deleted checkpoints of {len(rows)} expired runs")
+        return len(rows)
+
+    async def sweep_periodically(self, interval: float):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Checkpoint sweep failed: {e}")
+            await asyncio.sleep(interval)
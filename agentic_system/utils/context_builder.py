@@ -0,0 +1,128 @@
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from schemas.state import SearchResult
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# A snippet cut shorter than this carries too little to be worth the tokens
+MIN_ITEM_TOKENS = 16
+
+
+class _Tokenizer:
+    """Counts and truncates text in model tokens, estimating when no encoding is available."""
+
+    def __init__(self, model: str):
+        try:
+            import tiktoken
+            self._encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            # e.g. the BPE file cannot be downloaded; about four characters per token for English
+            logger.warning(f"Tokenizer for {model} unavailable, estimating token counts: {e}")
+            self._encoding = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is None:
+            return math.ceil(len(text) / 4)
+        return len(self._encoding.encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.count(text) <= max_tokens:
+            return text
+        if self._encoding is None:
+            return text[:max_tokens * 4].rstrip() + "…"
+        return self._encoding.decode(self._encoding.encode(text)[:max_tokens]).rstrip() + "…"
+
+
+_tokenizers: Dict[str, _Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(model: str = "gpt-4o-mini") -> _Tokenizer:
+    """Shared tokenizer for a model. The first call may download the encoding, so
+    async callers should run whatever needs it in a thread."""
+    tokenizer = _tokenizers.get(model)
+    if tokenizer is None:
+        # Held while loading, so concurrent first calls load (and warn) only once
+        with _tokenizers_lock:
+            tokenizer = _tokenizers.get(model)
+            if tokenizer is None:
+                tokenizer = _tokenizers[model] = _Tokenizer(model)
+    return tokenizer
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _bm25_scores(query: Sequence[str], documents: List[List[str]], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    if not documents:
+        return []
+    average_length = sum(len(doc) for doc in documents) / len(documents) or 1.0
+    document_frequency = Counter(word for doc in documents for word in set(doc))
+    scores = []
+    for doc in documents:
+        frequencies = Counter(doc)
+        score = 0.0
+        for word in set(query):
+            frequency = frequencies.get(word, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(documents) - document_frequency[word] + 0.5) / (document_frequency[word] + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * len(doc) / average_length))
+        scores.append(score)
+    return scores
+
+
+def _shingles(words: List[str], n: int = 3) -> frozenset:
+    return frozenset(tuple(words[i:i + n]) for i in range(max(1, len(words) - n + 1)))
+
+
+def build_search_context(
+    search_results: List[SearchResult],
+    query: str,
+    budget_tokens: int,
+    max_item_tokens: int = 120,
+    duplicate_threshold: float = 0.6,
+) -> str:
+    """Pack the search evidence most relevant to ``query`` into at most ``budget_tokens`` tokens.
+
+    Every SearchItem is scored with BM25 against the query (e.g. theme and target
+    audience). Items sharing no words with the query and near-duplicates of a
+    better-ranked snippet (word-trigram Jaccard above ``duplicate_threshold``) are
+    dropped; the rest are added best first as ``- title: content`` lines, each cut
+    to ``max_item_tokens`` or to what is left of the budget. Returns an empty
+    string when there is no relevant evidence.
+    """
+    tokenizer = get_tokenizer()
+    candidates = []
+    for result in search_results:
+        for item in result.results:
+            text = f"{item.title}: {item.content}" if item.content else item.title
+            # The search term counts towards relevance but not towards duplicate detection
+            candidates.append((text, _words(text), _words(result.term)))
+    scores = _bm25_scores(_words(query), [words + term_words for _, words, term_words in candidates])
+    ranked = sorted(zip(scores, candidates), key=lambda pair: pair[0], reverse=True)
+
+    lines, kept_shingles, used = [], [], 0
+    for score, (text, words, _) in ranked:
+        remaining = budget_tokens - used
+        if score <= 0 or remaining < MIN_ITEM_TOKENS:
+            break
+        shingles = _shingles(words)
+        if any(len(shingles & seen) / len(shingles | seen) > duplicate_threshold for seen in kept_shingles):
+            continue
+        # Leave room for the "- " prefix and the newline
+        line = "- " + tokenizer.truncate(text, min(max_item_tokens, remaining) - 3)
+        cost = tokenizer.count(line + "\n")
+        if used + cost > budget_tokens:
+            continue
+        lines.append(line)
+        kept_shingles.append(shingles)
+        used += cost
+    return "\n".join(lines)
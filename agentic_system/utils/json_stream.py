@@ -0,0 +1,92 @@
+import json
+import re
+from typing import List, Tuple
+
+# A raw string tail that cannot be decoded yet: a lone backslash or an incomplete \u escape
+_INCOMPLETE_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+# A trailing high surrogate whose low half has not arrived yet
+_HIGH_SURROGATE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}$")
+
+
+class JsonObjectStreamParser:
+    """Incrementally extract fields of a JSON object while it is being streamed.
+
+    Feed raw text chunks with ``feed``. For every top-level string value it yields
+    ``(key, "text", delta)`` as soon as characters arrive, and ``(key, "end", "")``
+    once the string is closed. For top-level arrays of strings it yields
+    ``(key, "item", value)`` as each element completes.
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._expect_key = False
+        self._key = None
+        self._in_string = False
+        self._escaped = False
+        self._string_is_key = False
+        self._raw = []
+        self._pending = ""
+        self._item = ""
+
+    def _emit_text(self, final: bool) -> str:
+        raw = self._pending + "".join(self._raw)
+        self._raw = []
+        cut = len(raw)
+        if not final:
+            for pattern in (_INCOMPLETE_ESCAPE, _HIGH_SURROGATE):
+                match = pattern.search(raw, 0, cut)
+                # An odd run of backslashes before the match means its backslash is itself escaped
+                if match and (match.start() - len(raw[:match.start()].rstrip("\\"))) % 2 == 0:
+                    cut = match.start()
+        self._pending = raw[cut:]
+        return json.loads(f'"{raw[:cut]}"', strict=False) if cut else ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, str]]:
+        events = []
+        for char in chunk:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    self._raw.append(char)
+                elif char == "\\":
+                    self._escaped = True
+                    self._raw.append(char)
+                elif char == '"':
+                    self._in_string = False
+                    text = self._emit_text(final=True)
+                    if self._string_is_key:
+                        self._key = text
+                    elif len(self._stack) == 1:
+                        if text:
+                            events.append((self._key, "text", text))
+                        events.append((self._key, "end", ""))
+                    elif len(self._stack) == 2 and self._stack[1] == "[":
+                        events.append((self._key, "item", self._item + text))
+                else:
+                    self._raw.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = self._expect_key and self._stack[-1:] == ["{"]
+                self._item = ""
+            elif char in "{[":
+                self._stack.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif char == ",":
+                self._expect_key = self._stack[-1:] == ["{"]
+            elif char == ":":
+                self._expect_key = False
+
+        # Flush what has arrived of a top-level string value that is still open
+        if self._in_string and not self._string_is_key:
+            if len(self._stack) == 1:
+                text = self._emit_text(final=False)
+                if text:
+                    events.append((self._key, "text", text))
+            elif len(self._stack) == 2 and self._stack[1] == "[":
+                self._item += self._emit_text(final=False)
+        return events
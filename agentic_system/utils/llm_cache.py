@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils.cache import TTLCache
+from utils.metrics import provider_call
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _normalize_messages(messages) -> List[Dict[str, str]]:
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role", ""), message.get("content", "")
+        else:
+            role, content = getattr(message, "type", ""), getattr(message, "content", "")
+        normalized.append({"role": role, "content": _normalize_text(str(content))})
+    return normalized
+
+
+def _ngrams(text: str, n: int = 3) -> frozenset:
+    # Punctuation is folded into spaces so "Gen-Z" and "Gen Z" share their trigrams
+    text = " " + _normalize_text(re.sub(r"[^\w]+", " ", text)).lower() + " "
+    return frozenset(text[i:i + n] for i in range(max(1, len(text) - n + 1)))
+
+
+class NgramIndex:
+    """Bounded LRU index of character trigram sets, matched by Jaccard similarity."""
+
+    def __init__(self, maxsize: int, threshold: float):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, namespace: str, text: str) -> Optional[Any]:
+        grams = _ngrams(text)
+        best_key, best_score = None, self.threshold
+        with self._lock:
+            for key, (entry_namespace, entry_grams, _) in self._entries.items():
+                if entry_namespace != namespace:
+                    continue
+                score = len(grams & entry_grams) / len(grams | entry_grams)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2]
+
+    def add(self, namespace: str, text: str, value: Any):
+        key = (namespace, _normalize_text(text).lower())
+        with self._lock:
+            self._entries[key] = (namespace, _ngrams(text), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def _record_usage(call, messages, content: str, response):
+    usage = getattr(response, "usage_metadata", None) or {}
+    call.record_tokens(usage.get("input_tokens"), usage.get("output_tokens"))
+    call.record_payload(sent=_normalize_messages(messages), received=content)
+
+
+class CachedChatModel:
+    """Wraps a chat model with an exact-match response cache and an optional similarity tier.
+
+    The exact tier is keyed on the normalized message list plus the model parameters.
+    Only response content is cached, so a client whose responses carry tool calls
+    is built without an exact tier (``exact=None``) and always calls the model.
+    The similarity tier is only consulted when the call site passes ``similarity_text``,
+    the short user-controlled part of the prompt (e.g. the raw request), so that the
+    shared prompt template does not make unrelated requests look alike.
+
+    Only responses the caller would accept are stored: never empty content, for
+    ``response_format={"type": "json_object"}`` only a JSON object, and only if the
+    call site's ``validate(content)`` (when given) returns true. ``cache_responses=False``
+    skips the lookup for one call, e.g. when a step is retried because of what the
+    model answered; an accepted answer still replaces the cached one.
+    """
+
+    def __init__(self, llm, model_params: Dict[str, Any], exact: Optional[TTLCache], similar: Optional[NgramIndex] = None):
+        self.llm = llm
+        self.model_params = model_params
+        self.exact = exact
+        self.similar = similar
+        self._stats = defaultdict(lambda: {"exact_hits": 0, "similar_hits": 0, "misses": 0})
+        self._stats_lock = threading.Lock()
+
+    def _record(self, call_site: str, outcome: str):
+        with self._stats_lock:
+            self._stats[call_site][outcome] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit counts and hit rate per call site."""
+        with self._stats_lock:
+            report = {}
+            for call_site, counts in self._stats.items():
+                total = sum(counts.values())
+                hits = counts["exact_hits"] + counts["similar_hits"]
+                report[call_site] = {**counts, "hit_rate": hits / total if total else 0.0}
+            return report
+
+    def _lookup(self, messages, call_site: str, similarity_text: Optional[str], kwargs: Dict[str, Any], use_cached: bool = True):
+        """Return ``(cached_content, key, namespace)``; cached_content is None on a miss."""
+        if self.exact is None:
+            return None, None, None
+        params = {**self.model_params, **kwargs}
+        key = hashlib.sha256(
+            json.dumps([_normalize_messages(messages), params], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        namespace = json.dumps([call_site, params], sort_keys=True, default=str)
+
+        if not use_cached:
+            self._record(call_site, "misses")
+            return None, key, namespace
+        content = self.exact.get(key)
+        if content is not None:
+            self._record(call_site, "exact_hits")
+            return content, key, namespace
+        if self.similar is not None and similarity_text:
+            content = self.similar.lookup(namespace, similarity_text)
+            if content is not None:
+                self._record(call_site, "similar_hits")
+                return content, key, namespace
+        self._record(call_site, "misses")
+        return None, key, namespace
+
+    @staticmethod
+    def _acceptable(content: str, kwargs: Dict[str, Any], validate: Optional[Callable[[str], bool]]) -> bool:
+        if not content:
+            return False
+        try:
+            if (kwargs.get("response_format") or {}).get("type") == "json_object" and not isinstance(json.loads(content), dict):
+                return False
+            return validate is None or bool(validate(content))
+        except Exception:
+            return False
+
+    def _store(self, key: Optional[str], namespace: Optional[str], similarity_text: Optional[str], content: str):
+        if key is None:
+            return
+        self.exact.set(key, content)
+        if self.similar is not None and similarity_text:
+            self.similar.add(namespace, similarity_text, content)
+
+    async def ainvoke(
+        self, messages, *, call_site: str = "default", similarity_text: Optional[str] = None,
+        validate: Optional[Callable[[str], bool]] = None, cache_responses: bool = True, **kwargs
+    ) -> AIMessage:
+        content, key, namespace = self._lookup(messages, call_site, similarity_text, kwargs, use_cached=cache_responses)
+        if content is not None:
+            return AIMessage(content=content)
+        async with provider_call("openai", call_site) as call:
+            response = await self.llm.ainvoke(messages, **kwargs)
+            _record_usage(call, messages, response.content, response)
+        if self._acceptable(response.content, kwargs, validate):
+            self._store(key, namespace, similarity_text, response.content)
+        return response
+
+    async def astream(
+        self, messages, *, call_site: str = "default", similarity_text: Optional[str] = None,
+        validate: Optional[Callable[[str], bool]] = None, cache_responses: bool = True, **kwargs
+    ):
+        """Stream response chunks; a cache hit is yielded as a single chunk."""
+        content, key, namespace = self._lookup(messages, call_site, similarity_text, kwargs, use_cached=cache_responses)
+        if content is not None:
+            yield AIMessageChunk(content=content)
+            return
+        parts, usage_chunk = [], None
+        async with provider_call("openai", call_site) as call:
+            async for chunk in self.llm.astream(messages, **kwargs):
+                parts.append(chunk.content)
+                if getattr(chunk, "usage_metadata", None):
+                    usage_chunk = chunk
+                yield chunk
+            _record_usage(call, messages, "".join(parts), usage_chunk)
+        if self._acceptable("".join(parts), kwargs, validate):
+            self._store(key, namespace, similarity_text, "".join(parts))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+def make_cached_model(llm, model_params: Dict[str, Any], cache_responses: bool = True) -> CachedChatModel:
+    """Wrap ``llm`` using the LLM_CACHE_* environment settings; with ``cache_responses=False`` nothing is cached."""
+    if not cache_responses:
+        return CachedChatModel(llm, model_params, exact=None)
+    exact = TTLCache(
+        maxsize=int(os.environ.get("LLM_CACHE_SIZE", 1024)),
+        ttl=float(os.environ.get("LLM_CACHE_TTL", 24 * 60 * 60)),
+    )
+    similar = None
+    threshold = os.environ.get("LLM_CACHE_SIMILARITY_THRESHOLD")
+    if threshold:
+        similar = NgramIndex(
+            maxsize=int(os.environ.get("LLM_CACHE_SIMILARITY_SIZE", 512)),
+            threshold=float(threshold),
+        )
+    return CachedChatModel(llm, model_params, exact, similar)
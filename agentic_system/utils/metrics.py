@@ -0,0 +1,237 @@
+import asyncio
+import inspect
+import json
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# A campaign takes up to a minute or so; single steps range from milliseconds (cache hits) to tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+RUN_SECONDS = Histogram(
+    "campaign_run_seconds", "Wall time of one campaign run through the graph",
+    ["outcome"], buckets=LATENCY_BUCKETS,
+)
+NODE_SECONDS = Histogram(
+    "campaign_node_seconds", "Wall time of one graph node execution",
+    ["node", "outcome"], buckets=LATENCY_BUCKETS,
+)
+JOB_QUEUE_SECONDS = Histogram(
+    "campaign_job_queue_seconds", "Time a queued campaign job waited for a worker",
+    buckets=LATENCY_BUCKETS,
+)
+CALL_SECONDS = Histogram(
+    "provider_call_seconds", "Wall time of one outbound provider call, including retries",
+    ["provider", "operation", "outcome"], buckets=LATENCY_BUCKETS,
+)
+QUEUE_SECONDS = Histogram(
+    "provider_queue_seconds", "Time an outbound call waited for a rate limiter token or a concurrency slot",
+    ["provider", "gate"], buckets=LATENCY_BUCKETS,
+)
+CALL_RETRIES = Counter(
+    "provider_call_retries", "Attempts of outbound calls beyond the first",
+    ["provider", "operation"],
+)
+CALL_TOKENS = Histogram(
+    "provider_call_tokens", "Prompt and completion tokens per outbound model call",
+    ["provider", "operation", "kind"], buckets=TOKEN_BUCKETS,
+)
+PAYLOAD_BYTES = Histogram(
+    "provider_payload_bytes", "Bytes sent to and received from a provider per call",
+    ["provider", "direction"], buckets=BYTE_BUCKETS,
+)
+
+
+def _payload_size(payload: Any) -> int:
+    if payload is None:
+        return 0
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return len(payload)
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    return len(json.dumps(payload, default=str).encode("utf-8"))
+
+
+class ProviderCall:
+    """Measurements of one outbound call, filled in by the call site inside ``provider_call``."""
+
+    def __init__(self, provider: str, operation: str):
+        self.provider = provider
+        self.operation = operation
+        # Counted by the HTTP client hook where the SDK retries on its own (see count_attempt)
+        self.attempts = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.sent_bytes = 0
+        self.received_bytes = 0
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def record_tokens(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    def record_payload(self, sent: Any = None, received: Any = None):
+        """Sizes of the request and response payloads; bytes and strings as is, anything else as JSON."""
+        self.sent_bytes += _payload_size(sent)
+        self.received_bytes += _payload_size(received)
+
+
+class RunMetrics:
+    """Timing breakdown of one campaign run, collected from the nodes and calls made inside it.
+
+    Nodes dispatched in the same superstep run in parallel, so node times can add
+    up to more than the total. Lookups shared between the campaigns of a batch are
+    attributed to the campaign that made them.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.total_seconds = 0.0
+        self.nodes = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        self.providers = defaultdict(lambda: {
+            "calls": 0, "errors": 0, "seconds": 0.0, "queue_seconds": 0.0, "retries": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "sent_bytes": 0, "received_bytes": 0,
+        })
+
+    def add_node(self, node: str, seconds: float):
+        self.nodes[node]["count"] += 1
+        self.nodes[node]["seconds"] += seconds
+
+    def add_queue(self, provider: str, seconds: float):
+        self.providers[provider]["queue_seconds"] += seconds
+
+    def add_call(self, call: ProviderCall, seconds: float, outcome: str):
+        totals = self.providers[call.provider]
+        totals["calls"] += 1
+        totals["errors"] += outcome != "ok"
+        totals["seconds"] += seconds
+        totals["retries"] += call.retries
+        totals["prompt_tokens"] += call.prompt_tokens
+        totals["completion_tokens"] += call.completion_tokens
+        totals["sent_bytes"] += call.sent_bytes
+        totals["received_bytes"] += call.received_bytes
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(self.total_seconds, 4),
+            "nodes": {node: {**totals, "seconds": round(totals["seconds"], 4)} for node, totals in self.nodes.items()},
+            "providers": {
+                provider: {
+                    **totals,
+                    "seconds": round(totals["seconds"], 4),
+                    "queue_seconds": round(totals["queue_seconds"], 4),
+                }
+                for provider, totals in self.providers.items()
+            },
+        }
+
+
+# Tasks the graph starts copy the context they are created in, so every node and
+# provider call of a run sees the RunMetrics the request handler set up.
+current_run: ContextVar[Optional[RunMetrics]] = ContextVar("current_run", default=None)
+_current_call: ContextVar[Optional[ProviderCall]] = ContextVar("current_call", default=None)
+
+
+@contextmanager
+def track_run() -> Iterator[RunMetrics]:
+    """Collect a RunMetrics for the graph invocation made inside the block."""
+    run = RunMetrics()
+    previous = current_run.get()
+    current_run.set(run)
+    outcome = "error"
+    try:
+        yield run
+        outcome = "ok"
+    finally:
+        run.total_seconds = time.perf_counter() - run._started
+        # Restore rather than reset: a streamed run may be closed from another context
+        current_run.set(previous)
+        RUN_SECONDS.labels(outcome).observe(run.total_seconds)
+
+
+def timed_node(name: str, node: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Wrap a graph node so each execution is recorded under ``name``."""
+    takes_config = "config" in inspect.signature(node).parameters
+
+    async def run_node(state, config: RunnableConfig):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await (node(state, config) if takes_config else node(state))
+            outcome = "ok"
+            return result
+        finally:
+            seconds = time.perf_counter() - started
+            NODE_SECONDS.labels(name, outcome).observe(seconds)
+            run = current_run.get()
+            if run is not None:
+                run.add_node(name, seconds)
+
+    run_node.__name__ = name
+    return run_node
+
+
+@asynccontextmanager
+async def provider_call(provider: str, operation: str):
+    """Time one outbound call; the call site records tokens and payload sizes on the yielded ProviderCall."""
+    call = ProviderCall(provider, operation)
+    previous = _current_call.get()
+    _current_call.set(call)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield call
+        outcome = "ok"
+    finally:
+        seconds = time.perf_counter() - started
+        _current_call.set(previous)
+        CALL_SECONDS.labels(provider, operation, outcome).observe(seconds)
+        if call.retries:
+            CALL_RETRIES.labels(provider, operation).inc(call.retries)
+        if call.prompt_tokens or call.completion_tokens:
+            CALL_TOKENS.labels(provider, operation, "prompt").observe(call.prompt_tokens)
+            CALL_TOKENS.labels(provider, operation, "completion").observe(call.completion_tokens)
+        PAYLOAD_BYTES.labels(provider, "sent").observe(call.sent_bytes)
+        PAYLOAD_BYTES.labels(provider, "received").observe(call.received_bytes)
+        run = current_run.get()
+        if run is not None:
+            run.add_call(call, seconds, outcome)
+
+
+async def count_attempt(request):
+    """httpx request hook: counts every HTTP attempt of the current provider call, retries included."""
+    call = _current_call.get()
+    if call is not None:
+        call.attempts += 1
+
+
+def record_queue(provider: str, gate: str, seconds: float):
+    """Record time spent waiting at a ``rate_limit`` or ``concurrency`` gate before calling a provider."""
+    QUEUE_SECONDS.labels(provider, gate).observe(seconds)
+    run = current_run.get()
+    if run is not None:
+        run.add_queue(provider, seconds)
+
+
+@asynccontextmanager
+async def concurrency_slot(provider: str, semaphore: asyncio.Semaphore):
+    """Hold ``semaphore`` for the block, recording how long it took to get it."""
+    started = time.perf_counter()
+    async with semaphore:
+        record_queue(provider, "concurrency", time.perf_counter() - started)
+        yield
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus exposition of the default registry and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
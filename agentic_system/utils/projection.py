@@ -0,0 +1,39 @@
+import threading
+from typing import Dict, FrozenSet, Iterable, Type
+
+from pydantic import BaseModel
+
+
+class FieldProjection:
+    """Registry of the fields of a record type that each consumer reads.
+
+    Consumers declare their fields once (typically at import time) with ``require``;
+    the producer then fetches and keeps only the union, so data nobody reads is not
+    downloaded, cached or carried in the campaign state.
+    """
+
+    def __init__(self, model: Type[BaseModel], always: Iterable[str] = ()):
+        self.model = model
+        self._always = frozenset(always)
+        self._check(self._always)
+        self._consumers: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def _check(self, fields: FrozenSet[str]):
+        unknown = fields - set(self.model.model_fields)
+        if unknown:
+            raise ValueError(f"{self.model.__name__} has no fields {sorted(unknown)}")
+
+    def require(self, consumer: str, *fields: str):
+        fields = frozenset(fields)
+        self._check(fields)
+        with self._lock:
+            self._consumers[consumer] = fields
+
+    def fields(self) -> FrozenSet[str]:
+        with self._lock:
+            return self._always.union(*self._consumers.values())
+
+    def project(self, record: dict) -> dict:
+        fields = self.fields()
+        return {key: value for key, value in record.items() if key in fields}
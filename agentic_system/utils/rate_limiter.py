@@ -0,0 +1,61 @@
+import asyncio
+import os
+import threading
+import time
+
+from utils.metrics import record_queue
+
+# Requests per second and burst size per external provider, overridable through
+# <PROVIDER>_RATE_LIMIT and <PROVIDER>_RATE_BURST environment variables.
+DEFAULT_LIMITS = {
+    "serpapi": (1.0, 5),
+    "tavily": (1.0, 5),
+}
+
+
+class TokenBucket:
+    """Token-bucket limiter shared by every coroutine that talks to one provider."""
+
+    def __init__(self, rate: float, capacity: float, name: str = ""):
+        self.rate = rate
+        self.capacity = capacity
+        self.name = name
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self._reserve()
+        if self.name:
+            record_queue(self.name, "rate_limit", delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """Return the process-wide limiter for a provider, creating it on first use."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                rate, burst = DEFAULT_LIMITS.get(provider, (1.0, 1))
+                rate = float(os.environ.get(f"{provider.upper()}_RATE_LIMIT", rate))
+                burst = float(os.environ.get(f"{provider.upper()}_RATE_BURST", burst))
+                limiter = TokenBucket(rate=rate, capacity=max(1.0, burst), name=provider)
+                _limiters[provider] = limiter
+    return limiter
@@ -0,0 +1,31 @@
+import re
+from typing import List
+
+# Scene timing markers such as [0:00–0:05]; scripts use an en dash, em dash or hyphen
+TIMING_MARKER = re.compile(r"\[\s*\d{1,2}:\d{2}\s*[–—-]\s*\d{1,2}:\d{2}\s*\]")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_script(script: str, max_chars: int) -> List[str]:
+    """Split a script into speech chunks on scene and sentence boundaries.
+
+    Every timing marker starts a new chunk, and within a scene whole sentences are
+    grouped while they fit in ``max_chars`` (a single longer sentence becomes its
+    own chunk). Boundaries only depend on the text before them, so every chunk but
+    the last one is already final while the script is still being streamed.
+    """
+    scene_starts = [match.start() for match in TIMING_MARKER.finditer(script)]
+    scene_bounds = sorted({0, *scene_starts, len(script)})
+    chunks = []
+    for scene_start, scene_end in zip(scene_bounds, scene_bounds[1:]):
+        scene = script[scene_start:scene_end]
+        current = ""
+        for sentence in _SENTENCE_END.split(scene):
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current.strip():
+            chunks.append(current)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
@@ -0,0 +1,51 @@
+import asyncio
+from collections import Counter
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+
+class SharedResearch:
+    """Batch-scoped memo that runs each external lookup once and shares its result.
+
+    Campaigns of one batch run concurrently inside the same context, so identical
+    lookups (same provider and key) join the first caller's in-flight request or
+    reuse its finished result instead of calling the provider again.
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self.requested = Counter()
+        self.executed = Counter()
+
+    async def run(self, provider: str, key: str, factory: Callable[[], Awaitable]):
+        self.requested[provider] += 1
+        future = self._futures.get((provider, key))
+        if future is None:
+            self.executed[provider] += 1
+            future = asyncio.ensure_future(factory())
+            self._futures[(provider, key)] = future
+        # Shield so one cancelled campaign does not cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    def report(self) -> dict:
+        requested = sum(self.requested.values())
+        executed = sum(self.executed.values())
+        return {
+            "external_calls_requested": requested,
+            "external_calls_made": executed,
+            "external_calls_saved": requested - executed,
+            "saved_by_provider": {
+                provider: self.requested[provider] - self.executed[provider] for provider in self.requested
+            },
+        }
+
+
+current_research: ContextVar[Optional[SharedResearch]] = ContextVar("current_research", default=None)
+
+
+async def shared_lookup(provider: str, key: str, factory: Callable[[], Awaitable]):
+    """Run ``factory`` through the active batch memo, or directly outside a batch."""
+    research = current_research.get()
+    if research is None:
+        return await factory()
+    return await research.run(provider, key, factory)
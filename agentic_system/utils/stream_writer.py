@@ -0,0 +1,16 @@
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import set_config_context
+from langgraph.config import get_stream_writer
+
+
+def stream_writer(config: RunnableConfig):
+    """The LangGraph stream writer of the current run, or a no-op outside a graph run.
+
+    Resolved from the explicit config because Python 3.10 does not carry the run
+    config into async tools through context variables.
+    """
+    with set_config_context(config) as context:
+        try:
+            return context.run(get_stream_writer)
+        except (RuntimeError, KeyError):
+            return lambda _: None
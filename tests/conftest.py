@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+# Provider clients refuse to start without keys; no test talks to a real provider
+for key in ("OPENAI_API_KEY", "GEMINI_API_KEY", "TAVILY_API_KEY", "NEW_SERPAPI_KEY"):
+    os.environ.setdefault(key, "test-dummy-key")
+
+
+@pytest.fixture
+def providers(tmp_path, monkeypatch):
+    """Every provider replaced by the in-process fakes of the offline benchmark; returns their call counters."""
+    import langchain_openai
+    from benchmarks import fake_providers
+    from configs import llm_config
+    from services import search_tool, trend_tool, tts_tool
+    from utils import audio_artifacts
+    from utils.artifact_store import ArtifactStore
+
+    # Recorded so the fakes are taken out again after the test
+    monkeypatch.setattr(langchain_openai, "ChatOpenAI", langchain_openai.ChatOpenAI)
+    monkeypatch.setattr(llm_config, "_llms", {})
+    monkeypatch.setattr(trend_tool, "GoogleSearch", trend_tool.GoogleSearch)
+    monkeypatch.setattr(search_tool, "TavilySearchResults", search_tool.TavilySearchResults)
+    monkeypatch.setattr(tts_tool, "_client", tts_tool._client)
+    store = ArtifactStore(str(tmp_path / "artifacts"), 1024 ** 3, ".wav")
+    monkeypatch.setattr(audio_artifacts, "audio_store", store)
+    monkeypatch.setattr(tts_tool, "audio_store", store)
+    return fake_providers.install(time_scale=0)
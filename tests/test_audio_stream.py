@@ -0,0 +1,95 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import agent_router
+from utils import audio_artifacts
+from utils.artifact_store import ArtifactStore
+from utils.audio_stream import parse_byte_range
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, SIZE - 1)),
+    ("bytes=-100", (SIZE - 100, SIZE - 1)),
+    ("bytes=-5000", (0, SIZE - 1)),
+    ("bytes=900-5000", (900, SIZE - 1)),
+    ("bytes=999-999", (999, 999)),
+    (" bytes=10-20 ", (10, 20)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_byte_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "bytes=-", "bytes=0-10,20-30", "items=0-10", "bytes=a-b"])
+def test_unsupported_ranges_send_the_whole_file(header):
+    assert parse_byte_range(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", SIZE),
+    ("bytes=1000-1100", SIZE),
+    ("bytes=20-10", SIZE),
+    ("bytes=-0", SIZE),
+    ("bytes=0-", 0),
+])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(ValueError):
+        parse_byte_range(header, size)
+
+
+@pytest.fixture
+def audio(tmp_path, monkeypatch):
+    """A test client and the ID of a stored voice-over whose bytes are 0, 1, 2, ..."""
+    store = ArtifactStore(str(tmp_path), max_bytes=10 * SIZE, suffix=".wav")
+    monkeypatch.setattr(agent_router, "audio_store", store)
+    artifact_id = store.artifact_id("test")
+    content = bytes(i % 256 for i in range(SIZE))
+    store.put(artifact_id, lambda path: open(path, "wb").write(content))
+    app = FastAPI()
+    app.include_router(agent_router.router, prefix="/agent")
+    return TestClient(app), artifact_id, content
+
+
+def test_download_without_range(audio):
+    client, artifact_id, content = audio
+    response = client.get(f"/agent/audio/{artifact_id}")
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == content
+
+
+@pytest.mark.parametrize("header, start, end", [("bytes=10-19", 10, 19), ("bytes=-10", 990, 999), ("bytes=995-", 995, 999)])
+def test_download_of_a_range(audio, header, start, end):
+    client, artifact_id, content = audio
+    response = client.get(f"/agent/audio/{artifact_id}", headers={"Range": header})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{SIZE}"
+    assert response.headers["content-length"] == str(end - start + 1)
+    assert response.content == content[start:end + 1]
+
+
+def test_unsatisfiable_range_is_416(audio):
+    client, artifact_id, _ = audio
+    response = client.get(f"/agent/audio/{artifact_id}", headers={"Range": f"bytes={SIZE}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{SIZE}"
+
+
+def test_unknown_and_invalid_ids(audio):
+    client, _, _ = audio
+    assert client.get(f"/agent/audio/{'0' * 64}").status_code == 404
+    assert client.get("/agent/audio/not-an-id").status_code == 400
+
+
+def test_in_flight_audio_stays_available_while_any_campaign_synthesizes_it():
+    artifact_id = "a" * 64
+    first = audio_artifacts.start_in_flight(artifact_id, [])
+    second = audio_artifacts.start_in_flight(artifact_id, [])
+
+    audio_artifacts.end_in_flight(artifact_id, first)
+    assert audio_artifacts.in_flight_audio(artifact_id) is second
+    audio_artifacts.end_in_flight(artifact_id, second)
+    assert audio_artifacts.in_flight_audio(artifact_id) is None
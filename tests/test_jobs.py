@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from jobs import worker_pool
+from jobs.store import FAILED, QUEUED, RUNNING, SUCCEEDED, InMemoryJobStore, JobStore, SQLiteJobStore, new_job
+from jobs.worker_pool import CampaignJobQueue
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return InMemoryJobStore() if request.param == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def test_a_job_is_claimed_once(store):
+    store.create(new_job("a", "prompt"))
+    claimed = store.claim("a")
+    assert claimed.status == RUNNING and claimed.started_at is not None
+    assert store.get("a").status == RUNNING
+    assert store.claim("a") is None
+    assert store.claim("missing") is None
+
+
+def test_sqlite_claims_are_shared_between_connections(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first, second = SQLiteJobStore(path), SQLiteJobStore(path)
+    first.create(new_job("a", "prompt"))
+    assert second.claim("a") is not None
+    assert first.claim("a") is None
+
+
+def test_sqlite_requeues_jobs_left_running(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = SQLiteJobStore(path)
+    for job_id in ("running", "queued", "done"):
+        store.create(new_job(job_id, "prompt"))
+    store.claim("running")
+    store.claim("done")
+    store.update("done", status=SUCCEEDED, finished_at=time.time())
+
+    requeued = SQLiteJobStore(path).requeue_unfinished()
+    assert [job.job_id for job in requeued] == ["running", "queued"]
+    assert all(job.status == QUEUED and job.started_at is None for job in requeued)
+    assert store.get("done").status == SUCCEEDED
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryJobStore
+    return lambda **retention: SQLiteJobStore(str(tmp_path / "jobs.db"), **retention)
+
+
+def test_store_evicts_the_oldest_finished_jobs(make_store):
+    store = make_store(retention_seconds=3600, max_finished=2)
+    for job_id in ("a", "b", "c", "queued"):
+        store.create(new_job(job_id, "prompt"))
+    for job_id in ("a", "b", "c"):
+        store.update(job_id, status=SUCCEEDED, finished_at=time.time())
+    assert store.get("a") is None
+    assert store.get("b") is not None and store.get("c") is not None
+    assert store.get("queued") is not None
+
+
+def test_store_evicts_expired_jobs(make_store):
+    store = make_store(retention_seconds=60, max_finished=100)
+    for job_id in ("old", "running", "new"):
+        store.create(new_job(job_id, "prompt"))
+    store.claim("running")
+    store.update("old", status=FAILED, finished_at=time.time() - 120)
+    store.claim("new")
+    assert store.get("old") is None
+    assert store.get("running").status == RUNNING
+    assert store.get("new") is not None
+
+
+class _BrokenStore(InMemoryJobStore):
+    """Fails to claim the first job it is asked for."""
+
+    def __init__(self):
+        super().__init__()
+        self.broken = True
+
+    def claim(self, job_id):
+        if self.broken:
+            self.broken = False
+            raise OSError("disk I/O error")
+        return super().claim(job_id)
+
+
+class _FailingGraph:
+    async def ainvoke(self, state):
+        raise RuntimeError("provider down")
+
+
+def test_worker_survives_store_failures(monkeypatch):
+    monkeypatch.setattr(worker_pool, "get_graph", lambda *args: _FailingGraph())
+
+    async def scenario():
+        queue = CampaignJobQueue(_BrokenStore(), workers=1, max_queued=10)
+        await queue.start()
+        first, second = queue.submit("first"), queue.submit("second")
+        await asyncio.wait_for(queue._queue.join(), timeout=5)
+        await queue.stop()
+        return queue.get(first.job_id), queue.get(second.job_id)
+
+    first, second = asyncio.run(scenario())
+    assert first.status == FAILED and "disk I/O error" in first.error
+    # The worker went on to the next job after the store failed
+    assert second.status == FAILED and "provider down" in second.error
+    assert second.timings is not None
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from utils.json_stream import JsonObjectStreamParser
+
+DOCUMENTS = [
+    {"script": "Plain text with \"quotes\", a back\\slash,\nnew lines\tand tabs", "production_ideas": ["one", "two"]},
+    {"script": "Accents: café, naïve, über", "production_ideas": ["résumé \"shot\""]},
+    {"script": "Emoji split across a surrogate pair: \U0001F600 and \U0001F680!", "production_ideas": ["\U0001F3AC scene"]},
+    {"script": "A literal backslash before a u: \\u0041 is not an escape", "production_ideas": ["\\", "\\\\u"]},
+]
+
+
+def _collect(chunks):
+    parser = JsonObjectStreamParser()
+    texts, ends, items = {}, [], {}
+    for chunk in chunks:
+        for key, kind, value in parser.feed(chunk):
+            # Every delta must be valid text on its own, never half of an escape or surrogate pair
+            value.encode("utf-8")
+            if kind == "text":
+                texts[key] = texts.get(key, "") + value
+            elif kind == "end":
+                ends.append(key)
+            else:
+                items.setdefault(key, []).append(value)
+    return texts, ends, items
+
+
+def _splits(raw):
+    yield [raw]
+    yield list(raw)
+    for cut in range(1, len(raw)):
+        yield [raw[:cut], raw[cut:]]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_every_split_yields_the_decoded_values(document, ensure_ascii):
+    raw = json.dumps(document, ensure_ascii=ensure_ascii)
+    for chunks in _splits(raw):
+        texts, ends, items = _collect(chunks)
+        assert texts == {"script": document["script"]}, chunks
+        assert ends == ["script"]
+        assert items == {"production_ideas": document["production_ideas"]}, chunks
+
+
+def test_text_is_emitted_before_the_string_closes():
+    parser = JsonObjectStreamParser()
+    assert parser.feed('{"script": "Hello') == [("script", "text", "Hello")]
+    assert parser.feed(" wor") == [("script", "text", " wor")]
+    assert parser.feed('ld", "production_ideas": ["a"') == [
+        ("script", "text", "ld"), ("script", "end", ""), ("production_ideas", "item", "a")
+    ]
+
+
+def test_incomplete_escapes_are_held_back():
+    parser = JsonObjectStreamParser()
+    assert parser.feed('{"script": "caf\\u00') == [("script", "text", "caf")]
+    assert parser.feed("e9 \\") == [("script", "text", "é ")]
+    assert parser.feed('"!\\ud83d') == [("script", "text", '"!')]
+    assert parser.feed('\\ude00"}') == [("script", "text", "\U0001F600"), ("script", "end", "")]
+
+
+def test_nested_values_are_not_reported():
+    raw = json.dumps({"meta": {"script": "inner", "tags": ["x"]}, "script": "outer"})
+    texts, ends, items = _collect([raw])
+    assert texts == {"script": "outer"}
+    assert ends == ["script"]
+    assert items == {}
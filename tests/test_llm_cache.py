@@ -0,0 +1,72 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from services.script_tool import _has_script
+from utils.cache import TTLCache
+from utils.llm_cache import CachedChatModel
+
+MESSAGES = [{"role": "user", "content": "Write the script as JSON."}]
+JSON_MODE = {"type": "json_object"}
+
+
+class _ScriptedModel:
+    """Answers each call with the next of ``responses``."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        return AIMessage(content=self.responses.pop(0))
+
+    async def astream(self, messages, **kwargs):
+        self.calls += 1
+        content = self.responses.pop(0)
+        for i in range(0, len(content), 5):
+            yield AIMessageChunk(content=content[i:i + 5])
+
+
+def _cached(llm):
+    return CachedChatModel(llm, {"model": "test"}, exact=TTLCache(maxsize=16, ttl=60))
+
+
+async def _stream(model, **kwargs):
+    return "".join([chunk.content async for chunk in model.astream(MESSAGES, call_site="test", **kwargs)])
+
+
+def test_malformed_json_is_not_cached():
+    llm = _ScriptedModel('{"script": "cut off', '{"script": "ok"}')
+    model = _cached(llm)
+
+    first = asyncio.run(model.ainvoke(MESSAGES, call_site="test", response_format=JSON_MODE))
+    second = asyncio.run(model.ainvoke(MESSAGES, call_site="test", response_format=JSON_MODE))
+    third = asyncio.run(model.ainvoke(MESSAGES, call_site="test", response_format=JSON_MODE))
+
+    assert first.content == '{"script": "cut off'
+    assert second.content == third.content == '{"script": "ok"}'
+    assert llm.calls == 2
+
+
+def test_response_rejected_by_the_call_site_is_not_served_again():
+    llm = _ScriptedModel('{"script": ""}', '{"script": "Hello there."}')
+    model = _cached(llm)
+
+    assert asyncio.run(_stream(model, response_format=JSON_MODE, validate=_has_script)) == '{"script": ""}'
+    assert asyncio.run(_stream(model, response_format=JSON_MODE, validate=_has_script)) == '{"script": "Hello there."}'
+    # The accepted answer is what the cache serves from now on
+    assert asyncio.run(_stream(model, response_format=JSON_MODE, validate=_has_script)) == '{"script": "Hello there."}'
+    assert llm.calls == 2
+
+
+def test_cache_can_be_bypassed_for_one_call():
+    llm = _ScriptedModel('{"script": "first"}', '{"script": "second"}')
+    model = _cached(llm)
+
+    asyncio.run(model.ainvoke(MESSAGES, call_site="test"))
+    bypassed = asyncio.run(model.ainvoke(MESSAGES, call_site="test", cache_responses=False))
+    cached = asyncio.run(model.ainvoke(MESSAGES, call_site="test"))
+
+    assert bypassed.content == cached.content == '{"script": "second"}'
+    assert llm.calls == 2
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from benchmarks import fake_providers
+from services import tts_tool
+from utils.checkpoints import CheckpointRetention
+from utils.llm_cache import CachedChatModel
+
+PROMPT = "Provide a complete campaign with hashtags, a script and a voice-over audio for {theme}"
+
+
+@pytest.fixture
+def client(providers, tmp_path, monkeypatch):
+    """The app on a fresh checkpoint database, with every provider replaced by the in-process fakes."""
+    monkeypatch.setenv("CHECKPOINT_PATH", str(tmp_path / "checkpoints.db"))
+
+    from main import app
+    with TestClient(app) as client:
+        yield client
+
+
+def _fail_once(monkeypatch, owner, name):
+    original = getattr(owner, name)
+    calls = []
+
+    def failing(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise fake_providers.FakeProviderError(f"Simulated {name} failure")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, failing)
+    return calls
+
+
+def _resume(client, run_id):
+    return client.post(f"/agent/query/{run_id}/resume")
+
+
+def test_failed_speech_step_is_retried_on_resume(client, monkeypatch):
+    _fail_once(monkeypatch, tts_tool._client.aio.models, "generate_content")
+
+    failed = client.post("/agent/query", json={"prompt": PROMPT.format(theme="eco sneakers")}).json()
+    assert "Simulated generate_content failure" in failed["error"]
+
+    resumed = _resume(client, failed["run_id"]).json()
+    assert resumed["audio_artifact_id"]
+    assert tts_tool.audio_store.get(resumed["audio_artifact_id"]) is not None
+    # Only the failed step (and the router deciding what is left) ran again
+    assert set(resumed["timings"]["nodes"]) == {"tts_generator", "llm_router"}
+
+
+def test_failed_script_step_is_retried_on_resume(client, monkeypatch):
+    _fail_once(monkeypatch, fake_providers.FakeChatModel, "astream")
+
+    failed = client.post("/agent/query", json={"prompt": PROMPT.format(theme="cold brew")}).json()
+    assert "Simulated astream failure" in failed["error"]
+
+    resumed = _resume(client, failed["run_id"]).json()
+    assert "fallback due to error" not in resumed["formatted_output"]
+    assert "Narrator" in resumed["formatted_output"]
+    assert {"script_generator", "tts_generator"} <= set(resumed["timings"]["nodes"])
+    assert not {"trend_analyzer", "search_engine"} & set(resumed["timings"]["nodes"])
+
+
+def test_invalid_script_is_asked_for_again_on_resume(client, monkeypatch):
+    original = fake_providers.FakeChatModel.astream
+    calls = []
+
+    async def astream(self, messages, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            yield AIMessageChunk(content='{"script": "", "production_ideas": []}')
+            return
+        async for chunk in original(self, messages, **kwargs):
+            yield chunk
+
+    monkeypatch.setattr(fake_providers.FakeChatModel, "astream", astream)
+    cache_settings = []
+    original_cached = CachedChatModel.astream
+
+    def cached_astream(self, messages, **kwargs):
+        cache_settings.append(kwargs.get("cache_responses", True))
+        return original_cached(self, messages, **kwargs)
+
+    monkeypatch.setattr(CachedChatModel, "astream", cached_astream)
+
+    failed = client.post("/agent/query", json={"prompt": PROMPT.format(theme="smart water bottles")}).json()
+    assert "Empty script generated" in failed["error"]
+
+    resumed = _resume(client, failed["run_id"]).json()
+    assert "Narrator" in resumed["formatted_output"]
+    assert len(calls) == 2
+    # The retried step skipped the response cache
+    assert cache_settings == [True, False]
+
+
+def test_checkpoints_are_deleted_once_a_run_succeeds(client):
+    response = client.post("/agent/query", json={"prompt": PROMPT.format(theme="vintage denim")}).json()
+    assert "error" not in response
+    assert _resume(client, response["run_id"]).status_code == 404
+
+
+def test_expired_runs_are_swept(tmp_path):
+    async def scenario():
+        async with AsyncSqliteSaver.from_conn_string(str(tmp_path / "checkpoints.db")) as checkpointer:
+            retention = CheckpointRetention(checkpointer, retention_seconds=0)
+            await retention.setup()
+            await retention.started("old")
+            return await retention.sweep(), await retention.sweep()
+
+    assert asyncio.run(scenario()) == (1, 0)
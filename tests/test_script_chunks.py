@@ -0,0 +1,40 @@
+import pytest
+
+from utils.script_chunks import _SENTENCE_END, split_script
+
+SCRIPT = (
+    "[0:00–0:05] Close-up of a phone buzzing. Narrator: Still scrolling? Not today! "
+    "[0:05—0:15] Quick cuts of friends in everyday places. Narrator: It fits your day, your budget and your feed. "
+    "No filters needed… Real people, real reactions. "
+    "[0:15-0:25] Narrator: A single sentence that runs on and on well past the chunk limit without ever stopping for breath "
+    "[0:25 – 0:30] Logo on screen. Narrator: Try it today."
+)
+
+
+def test_every_timing_marker_starts_a_chunk():
+    chunks = split_script(SCRIPT, max_chars=1000)
+    assert [chunk[:7] for chunk in chunks] == ["[0:00–0", "[0:05—0", "[0:15-0", "[0:25 –"]
+
+
+def test_sentences_are_grouped_up_to_the_limit():
+    chunks = split_script(SCRIPT, max_chars=60)
+    assert "[0:05—0:15] Quick cuts of friends in everyday places." in chunks
+    assert "No filters needed… Real people, real reactions." in chunks
+    # A sentence longer than the limit is kept whole rather than cut
+    assert any(len(chunk) > 60 and chunk.endswith("breath") for chunk in chunks)
+    assert all(len(chunk) <= 60 or len(_SENTENCE_END.split(chunk)) == 1 for chunk in chunks)
+    assert " ".join(chunks) == " ".join(SCRIPT.split())
+
+
+@pytest.mark.parametrize("max_chars", [20, 60, 120, 1000])
+def test_boundaries_are_stable_while_streaming(max_chars):
+    final = split_script(SCRIPT, max_chars)
+    for end in range(len(SCRIPT) + 1):
+        # Every chunk but the last one of a prefix is already final
+        settled = split_script(SCRIPT[:end], max_chars)[:-1]
+        assert settled == final[:len(settled)], SCRIPT[:end]
+
+
+def test_script_without_markers_or_text():
+    assert split_script("Just one line.", max_chars=100) == ["Just one line."]
+    assert split_script("  ", max_chars=100) == []
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent import new_campaign_state
+from schemas.state import SearchItem, SearchResult
+from services import hashtag_gen, script_tool
+from utils import context_builder
+from utils.context_builder import MIN_ITEM_TOKENS, build_search_context, get_tokenizer
+
+QUERY = "eco sneakers Gen Z"
+
+
+def _results(*items, term="eco sneakers"):
+    return [SearchResult(term=term, results=[SearchItem(title=title, content=content) for title, content in items])]
+
+
+class _Stop(Exception):
+    pass
+
+
+@pytest.mark.parametrize("module, generate", [
+    (hashtag_gen, lambda state: hashtag_gen.generate_hashtags(state)),
+    (script_tool, lambda state: script_tool.generate_script(state, {})),
+])
+def test_search_context_is_built_off_the_event_loop(monkeypatch, module, generate):
+    """The first call may download the tokenizer's encoding, which must not block the event loop."""
+    threads = []
+
+    def build_search_context(*args):
+        threads.append(threading.current_thread())
+        raise _Stop
+
+    monkeypatch.setattr(module, "build_search_context", build_search_context)
+    with pytest.raises(_Stop):
+        asyncio.run(generate(new_campaign_state("A campaign for eco sneakers")))
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_relevant_items_rank_first():
+    results = _results(
+        ("Cooking pasta", "Boil the water and add salt before the noodles."),
+        ("Eco sneakers for Gen Z", "Gen Z buyers pick eco sneakers made from recycled plastic."),
+        ("Weather report", "Rain expected over the weekend."),
+    )
+    lines = build_search_context(results, QUERY, budget_tokens=500).splitlines()
+    assert lines[0].startswith("- Eco sneakers for Gen Z")
+
+
+def test_items_sharing_no_words_with_the_query_are_dropped():
+    results = _results(("Weather report", "Rain expected over the weekend."), term="forecast")
+    assert build_search_context(results, QUERY, budget_tokens=500) == ""
+
+
+def test_near_duplicate_snippets_collapse_to_one():
+    snippet = "Gen Z shoppers are switching to eco sneakers made from recycled ocean plastic this spring"
+    results = _results(
+        ("Eco sneakers trend", snippet),
+        ("Eco sneakers trend (syndicated)", snippet + " again"),
+        ("Eco sneakers prices", "Eco sneakers cost less than leather ones for Gen Z budgets."),
+    )
+    lines = build_search_context(results, QUERY, budget_tokens=500).splitlines()
+    assert len(lines) == 2
+    assert sum("recycled ocean plastic" in line for line in lines) == 1
+
+
+@pytest.mark.parametrize("budget", [hashtag_gen.CONTEXT_TOKENS, script_tool.CONTEXT_TOKENS])
+def test_output_stays_within_the_token_budget(budget):
+    results = _results(*(
+        (f"Eco sneakers story {i}", f"Gen Z and eco sneakers, chapter {i}: " + "recycled soles and canvas uppers " * 40)
+        for i in range(30)
+    ))
+    context = build_search_context(results, QUERY, budget_tokens=budget)
+    assert context
+    assert get_tokenizer().count(context) <= budget
+
+
+def test_budget_below_one_item_yields_nothing():
+    results = _results(("Eco sneakers for Gen Z", "Gen Z buyers pick eco sneakers."))
+    assert build_search_context(results, QUERY, budget_tokens=MIN_ITEM_TOKENS - 1) == ""
+
+
+def test_tokenizer_is_loaded_once_under_concurrency(monkeypatch):
+    loaded = []
+
+    class SlowTokenizer:
+        def __init__(self, model):
+            loaded.append(model)
+            time.sleep(0.05)
+
+    monkeypatch.setattr(context_builder, "_Tokenizer", SlowTokenizer)
+    monkeypatch.setattr(context_builder, "_tokenizers", {})
+    tokenizers = []
+    threads = [threading.Thread(target=lambda: tokenizers.append(get_tokenizer("test-model"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loaded == ["test-model"]
+    assert len({id(tokenizer) for tokenizer in tokenizers}) == 1
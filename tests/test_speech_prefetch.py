@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from agent import new_campaign_state
+from schemas.state import Step
+from services import script_tool, tts_tool
+from utils.artifact_store import ArtifactStore
+
+SCRIPT = (
+    "[0:00–0:10] Narrator: Still scrolling past eco sneakers? Not today. "
+    "[0:10–0:20] Narrator: They fit your day, your budget and your feed. "
+    "[0:20–0:30] Narrator: Try them today."
+)
+
+
+@pytest.fixture
+def synthesized(tmp_path, monkeypatch):
+    """Semaphores every chunk synthesis was started with, instead of calling Gemini."""
+    semaphores = []
+
+    async def synthesize_chunk(text, semaphore):
+        semaphores.append(semaphore)
+        async with semaphore:
+            await asyncio.sleep(0.01)
+        return b"\x00\x00" * 10
+
+    monkeypatch.setattr(tts_tool, "_synthesize_chunk", synthesize_chunk)
+    monkeypatch.setattr(tts_tool, "audio_store", ArtifactStore(str(tmp_path), 1024 ** 2, ".wav"))
+    monkeypatch.setattr(tts_tool, "_prefetched", {})
+    monkeypatch.setattr(tts_tool, "_prefetch_semaphores", {})
+    return semaphores
+
+
+def test_speech_step_shares_the_prefetch_concurrency_limit(synthesized):
+    async def scenario():
+        prefetcher = tts_tool.SpeechPrefetcher()
+        prefetcher.feed(SCRIPT)
+        prefetcher.finish(SCRIPT)
+        # As if one prefetched chunk had expired, so the TTS step has to start it again
+        tts_tool._prefetched.pop(next(iter(tts_tool._prefetched)))
+        state = new_campaign_state("campaign").model_copy(update={"script": SCRIPT})
+        return prefetcher, await tts_tool.generate_speech(state, {})
+
+    prefetcher, result = asyncio.run(scenario())
+    assert result["audio_artifact_id"]
+    assert len(synthesized) == 4
+    assert all(semaphore is prefetcher._semaphore for semaphore in synthesized)
+    assert tts_tool._prefetch_semaphores == {}
+
+
+class _BrokenStream:
+    """Streams the first scenes of the script, then fails."""
+
+    async def astream(self, messages, **kwargs):
+        yield AIMessageChunk(content='{"script": "' + SCRIPT[:120])
+        raise RuntimeError("connection reset")
+
+
+def test_script_fallback_cancels_the_prefetches(synthesized, monkeypatch):
+    monkeypatch.setattr(script_tool, "get_llm", lambda *args: _BrokenStream())
+    started = []
+    original_start = tts_tool.SpeechPrefetcher._start
+
+    def start(self, chunks):
+        original_start(self, chunks)
+        started.extend(future for _, future in self._futures)
+
+    monkeypatch.setattr(tts_tool.SpeechPrefetcher, "_start", start)
+    state = new_campaign_state("campaign").model_copy(update={"steps": [Step(step="tts_generator", executed=False)]})
+
+    result = asyncio.run(script_tool.generate_script(state, {}))
+    assert "fallback due to error" in result["script"]
+    assert started and all(future.cancelled() for future in started)
+    assert tts_tool._prefetched == {}
@@ -0,0 +1,14 @@
+from benchmarks.startup import run_probe
+
+IMPORT_BUDGET_SECONDS = 5.0
+# Provider clients are imported on first use through the tool registry, never at startup
+LAZY_MODULES = ("langchain_openai", "google.genai", "tiktoken", "serpapi")
+
+
+def test_importing_the_app_is_offline_and_fast():
+    report = run_probe()
+    assert report["outbound_attempts"] == []
+    assert report["import_seconds"] < IMPORT_BUDGET_SECONDS
+    imported = {module["module"] for module in report["imports"]}
+    assert not imported & set(LAZY_MODULES)
+    assert not [module for module in imported if module.startswith("services.") and module.endswith("_tool")]
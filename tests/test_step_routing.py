@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from agent import build_graph, new_campaign_state
+from schemas.state import Step, merge_steps
+from services.llm_node import STEP_DEPENDENCIES, ready_steps, route_steps
+
+ALL_STEPS = list(STEP_DEPENDENCIES)
+
+
+def _steps(planned, executed=()):
+    return [Step(step=name, executed=name in executed) for name in planned]
+
+
+def _state(steps, current_step=""):
+    state = new_campaign_state("prompt")
+    return state.model_copy(update={"steps": steps, "current_step": current_step})
+
+
+def _run(planned):
+    """Dispatch ready steps superstep by superstep, as the router does, and return the batches."""
+    steps, batches = _steps(planned), []
+    while (batch := route_steps(_state(steps))) != ["END"]:
+        batches.append(batch)
+        steps = merge_steps(steps, [Step(step=name, executed=True) for name in batch])
+    return batches
+
+
+def test_independent_steps_fan_out_together():
+    steps = _steps(ALL_STEPS, executed=("trend_analyzer", "search_engine"))
+    assert ready_steps(steps) == ["hashtag_generator", "script_generator"]
+
+
+def test_speech_waits_for_the_script():
+    steps = _steps(ALL_STEPS, executed=("trend_analyzer", "search_engine", "hashtag_generator"))
+    assert ready_steps(steps) == ["script_generator"]
+    steps = _steps(ALL_STEPS, executed=("trend_analyzer", "search_engine", "script_generator"))
+    assert ready_steps(steps) == ["hashtag_generator", "tts_generator"]
+
+
+def test_dependencies_that_are_not_planned_are_skipped():
+    assert ready_steps(_steps(["script_generator", "tts_generator"])) == ["script_generator"]
+
+
+@pytest.mark.parametrize("planned, batches", [
+    (ALL_STEPS, [
+        ["trend_analyzer"], ["search_engine"], ["hashtag_generator", "script_generator"], ["tts_generator"],
+    ]),
+    (["trend_analyzer", "hashtag_generator"], [["trend_analyzer"], ["hashtag_generator"]]),
+    ([], []),
+])
+def test_every_planned_step_is_dispatched_once(planned, batches):
+    dispatched = _run(planned)
+    assert dispatched == batches
+    flat = [name for batch in dispatched for name in batch]
+    assert sorted(flat) == sorted(planned)
+
+
+def test_route_ends_once_every_step_has_run():
+    assert route_steps(_state(_steps(ALL_STEPS, executed=ALL_STEPS))) == ["END"]
+    # An ending router wins over steps left to run
+    assert route_steps(_state(_steps(ALL_STEPS), current_step="END")) == ["END"]
+
+
+def test_graph_runs_hashtags_and_script_in_one_superstep(providers):
+    async def supersteps():
+        steps = {}
+        state = new_campaign_state(
+            "Provide a complete campaign with hashtags, a script and a voice-over audio for eco sneakers"
+        )
+        async for event in build_graph().astream(state, stream_mode="debug"):
+            if event["type"] == "task" and event["payload"]["name"] != "llm_router":
+                steps.setdefault(event["step"], []).append(event["payload"]["name"])
+        return list(steps.values())
+
+    assert [sorted(names) for names in asyncio.run(supersteps())] == [
+        ["trend_analyzer"], ["search_engine"], ["hashtag_generator", "script_generator"], ["tts_generator"],
+    ]
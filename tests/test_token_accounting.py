@@ -0,0 +1,107 @@
+"""JSON-mode prompts must not pay for tool schemas; only the "tools" client sends them."""
+import asyncio
+import json
+
+import httpx
+import openai
+import pytest
+
+from agent import build_graph, new_campaign_state
+from configs import llm_config
+from services.registry import TOOLS
+from utils.context_builder import get_tokenizer
+
+# The JSON-mode LLM calls of a full campaign: parameter extraction, trend keywords, hashtags, script
+JSON_CALL_SITES = ("llm_router", "trend_analyzer", "hashtag_generator", "script_generator")
+
+TOOL_CALL = {"id": "call_1", "type": "function", "function": {"name": "trend_analyzer", "arguments": "{\"state\": {}}"}}
+
+
+def _completion(message: dict) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "message": {"role": "assistant", **message}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+@pytest.fixture
+def openai_requests(monkeypatch):
+    """Fresh LLM clients whose OpenAI requests are captured instead of sent."""
+    captured = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        captured.append(body)
+        if "tools" in body:
+            return httpx.Response(200, json=_completion({"content": None, "tool_calls": [TOOL_CALL]}))
+        return httpx.Response(200, json=_completion({"content": "{\"keywords\": []}"}))
+
+    monkeypatch.setattr(llm_config, "_llms", {})
+    monkeypatch.setattr(
+        openai, "DefaultAsyncHttpxClient",
+        lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(handler), **kwargs)
+    )
+    return captured
+
+
+def test_json_client_sends_no_tool_schemas(openai_requests):
+    llm = llm_config.get_llm("json")
+    asyncio.run(llm.ainvoke(
+        [{"role": "user", "content": "Return a JSON object with a 'keywords' list."}],
+        response_format={"type": "json_object"},
+        call_site="test",
+    ))
+
+    (body,) = openai_requests
+    assert "tools" not in body
+    assert "tool_choice" not in body
+    assert body["response_format"] == {"type": "json_object"}
+
+
+def test_tools_client_sends_every_tool_schema(openai_requests):
+    llm = llm_config.get_llm("tools")
+    asyncio.run(llm.ainvoke([{"role": "user", "content": "Analyze trends for sneakers."}], call_site="test"))
+
+    (body,) = openai_requests
+    assert sorted(tool["function"]["name"] for tool in body["tools"]) == sorted(TOOLS)
+
+
+def test_input_tokens_saved_per_campaign(openai_requests, request, record_property):
+    """Tool schema tokens each JSON-mode call of a full campaign would have sent with the tools bound."""
+    asyncio.run(llm_config.get_llm("tools").ainvoke([{"role": "user", "content": "Analyze trends."}], call_site="test"))
+    (body,) = openai_requests
+    # tiktoken's count when its encoding is available, the estimate otherwise
+    schema_tokens = get_tokenizer().count(json.dumps(body["tools"]))
+
+    # Count the JSON-mode calls one full campaign makes, against the fake providers
+    request.getfixturevalue("providers")
+    asyncio.run(build_graph().ainvoke(new_campaign_state(
+        "Provide a complete campaign with hashtags, a script and a voice-over audio for eco sneakers"
+    )))
+    calls = {call_site: stats["exact_hits"] + stats["similar_hits"] + stats["misses"]
+             for call_site, stats in llm_config.get_llm_stats().items()}
+    assert calls == dict.fromkeys(JSON_CALL_SITES, 1)
+
+    saved = schema_tokens * sum(calls.values())
+    record_property("tool_schema_tokens_per_call", schema_tokens)
+    record_property("input_tokens_saved_per_campaign", saved)
+    print(f"{schema_tokens} tool schema tokens per call x {sum(calls.values())} JSON-mode calls = {saved} tokens per campaign")
+    # Every tool schema embeds the campaign state, so the schemas alone run to thousands of tokens
+    assert schema_tokens > 1000
+    assert saved == schema_tokens * len(JSON_CALL_SITES)
+
+
+def test_tools_client_keeps_tool_calls_on_repeated_calls(openai_requests):
+    llm = llm_config.get_llm("tools")
+    messages = [{"role": "user", "content": "Analyze trends for sneakers."}]
+
+    first = asyncio.run(llm.ainvoke(messages, call_site="test"))
+    second = asyncio.run(llm.ainvoke(messages, call_site="test"))
+
+    assert first.tool_calls and second.tool_calls
+    assert second.tool_calls[0]["name"] == "trend_analyzer"
+    assert len(openai_requests) == 2
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from services import trend_tool
+from utils.cache import TTLCache
+
+GOOD = {"organic_results": [{"title": "Sneakers", "snippet": "eco sneakers everywhere"}]}
+
+
+@pytest.fixture
+def serpapi(monkeypatch):
+    """Queue the payloads the fake SerpAPI client returns, one per search."""
+    payloads = []
+
+    class FakeGoogleSearch:
+        def __init__(self, params):
+            self.params = params
+
+        def get_dict(self):
+            return payloads.pop(0)
+
+    monkeypatch.setattr(trend_tool, "GoogleSearch", FakeGoogleSearch)
+    monkeypatch.setattr(trend_tool, "trend_cache", TTLCache(maxsize=16, ttl=60))
+    return payloads
+
+
+@pytest.mark.parametrize("payload", [{"error": "Your account has run out of searches."}, {"search_metadata": {}}])
+def test_error_payloads_are_failures_and_not_cached(serpapi, payload):
+    serpapi.extend([payload, GOOD])
+
+    trend, error, cached = asyncio.run(trend_tool._fetch_trend("eco sneakers", "key"))
+    assert "error" in trend
+    assert error is not None and "Error fetching trends" in error.content
+    assert not cached
+
+    # The next lookup asks SerpAPI again instead of replaying the failure
+    trend, error, cached = asyncio.run(trend_tool._fetch_trend("eco sneakers", "key"))
+    assert error is None and not cached
+    assert trend["related_content"][0]["title"] == "Sneakers"
+
+    _, _, cached = asyncio.run(trend_tool._fetch_trend("eco sneakers", "key"))
+    assert cached